@@ -0,0 +1,63 @@
+"""
+Benchmark de los backends del bucle horario (kernels.py).
+
+Ejecuta simulate_demand_single_run() con cada backend y muestra el tiempo
+medio por ejecución y la desviación relativa frente a la referencia. Los
+consumos base sembrados se precalculan en la caché (sin checkpoints de
+ejecución), de modo que se mide el bucle de estrategia y dinámica del sistema
+que reemplaza el kernel, no la generación de números aleatorios.
+
+Uso:
+    python benchmarks/kernels.py [--hours 720] [--runs 5]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import kernels
+from models import SimulationParams
+from simulation import simulate_demand_single_run, validate_kernel_backend
+from simulation_cache import SimulationCache
+
+def time_backend(backend, params, strategy, runs):
+    kernels.set_backend(backend)
+    cache = SimulationCache()
+    # Primera ejecución fuera de la medición (compilación JIT, tablas, consumos base)
+    simulate_demand_single_run(params, strategy, seed=params.seed, cache=cache)
+    elapsed = 0.0
+    for _ in range(runs):
+        cache.clear_runs()
+        start = time.perf_counter()
+        simulate_demand_single_run(params, strategy, seed=params.seed, cache=cache)
+        elapsed += time.perf_counter() - start
+    return elapsed / runs
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de kernels de simulación")
+    parser.add_argument("--hours", type=int, default=720, help="Horas simuladas por ejecución")
+    parser.add_argument("--runs", type=int, default=5, help="Ejecuciones por backend")
+    parser.add_argument("--homes", type=int, default=50)
+    parser.add_argument("--businesses", type=int, default=20)
+    parser.add_argument("--industries", type=int, default=10)
+    args = parser.parse_args()
+
+    params = SimulationParams(
+        homes=args.homes, businesses=args.businesses, industries=args.industries,
+        simulation_hours=args.hours, seed=1
+    )
+    for strategy in ("fixed", "demand_response", "smart_grid"):
+        print(f"{strategy} ({args.hours} h):")
+        reference_time = None
+        for backend in kernels.KERNEL_BACKENDS:
+            elapsed = time_backend(backend, params, strategy, args.runs)
+            reference_time = reference_time or elapsed
+            line = f"  {backend:10s} {elapsed * 1000:9.2f} ms  x{reference_time / elapsed:5.2f}"
+            if backend != "reference":
+                line += f"  desviación máx. {validate_kernel_backend(backend, params):.2e}"
+            print(line)
+
+if __name__ == "__main__":
+    main()
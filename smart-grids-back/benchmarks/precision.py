@@ -0,0 +1,72 @@
+"""
+Comparación del modo float32 con float64 (SimulationParams.precision).
+
+Muestra, para cada estrategia, el tiempo y la memoria máxima asignada de una
+simulación Monte Carlo en cada precisión, y verifica con validate_precision()
+que peak_demand, average_demand y reduced_emissions no se desvían más de la
+tolerancia. Termina con código 1 si se supera (utilizable como comprobación
+en CI).
+
+Uso:
+    python benchmarks/precision.py [--hours 720] [--samples 10] [--rtol 1e-5]
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models import SimulationParams
+from precision import PRECISION_METRICS, validate_precision
+from simulation import PRECISION_DTYPES, simulate_demand
+from simulation_cache import simulation_cache
+
+def measure(params, strategy):
+    # Sin artefactos de ejecuciones anteriores: se mide también la caché de consumos base
+    simulation_cache.clear()
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = simulate_demand(params, strategy)
+    elapsed = time.perf_counter() - start
+    _, peak_memory = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak_memory
+
+def main():
+    parser = argparse.ArgumentParser(description="Comparación float32 / float64")
+    parser.add_argument("--hours", type=int, default=720, help="Horas simuladas por muestra")
+    parser.add_argument("--samples", type=int, default=10, help="Muestras Monte Carlo")
+    parser.add_argument("--homes", type=int, default=2000)
+    parser.add_argument("--businesses", type=int, default=400)
+    parser.add_argument("--industries", type=int, default=100)
+    parser.add_argument("--rtol", type=float, default=1e-5, help="Desviación relativa máxima admitida")
+    args = parser.parse_args()
+
+    params = SimulationParams(
+        homes=args.homes, businesses=args.businesses, industries=args.industries,
+        simulation_hours=args.hours, monte_carlo_samples=args.samples, seed=1
+    )
+    for strategy in ("fixed", "demand_response", "smart_grid"):
+        print(f"{strategy} ({args.samples} x {args.hours} h):")
+        results = {}
+        for precision in PRECISION_DTYPES:
+            result, elapsed, peak_memory = measure(params.model_copy(update={"precision": precision}), strategy)
+            results[precision] = result
+            print(f"  {precision}  {elapsed:8.2f} s  {peak_memory / 2**20:8.1f} MB")
+        deviations = "  ".join(
+            f"{key} {abs(results['float32'][key] - results['float64'][key]) / max(abs(results['float64'][key]), 1e-9):.1e}"
+            for key in PRECISION_METRICS
+        )
+        print(f"  desviación relativa: {deviations}")
+
+    try:
+        max_error = validate_precision(params, args.rtol)
+    except ValueError as e:
+        print(f"ERROR: {e}")
+        sys.exit(1)
+    print(f"OK: desviación máxima {max_error:.2e} <= {args.rtol:.1e}")
+
+if __name__ == "__main__":
+    main()
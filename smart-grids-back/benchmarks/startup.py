@@ -0,0 +1,98 @@
+"""
+Benchmark de arranque en frío del backend.
+
+Mide, en procesos nuevos de Python (como un worker recién escalado):
+
+1. El coste de importación de main.py usando `python -X importtime`.
+2. El tiempo hasta la primera respuesta de /simulate, con y sin precalentamiento.
+
+Uso:
+    python benchmarks/startup.py [--runs 5] [--top 10]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Script ejecutado en un proceso limpio: importa la app, ejecuta el lifespan
+# (precalentamiento) y atiende una primera petición llamando al handler.
+FIRST_RESPONSE_SCRIPT = """
+import asyncio, time
+t0 = time.perf_counter()
+import main
+from models import SimulationParams
+t_import = time.perf_counter()
+
+async def startup():
+    async with main.lifespan(main.app):
+        pass
+
+asyncio.run(startup())
+t_ready = time.perf_counter()
+
+params = SimulationParams(homes=50, businesses=20, industries=10, simulation_hours=24,
+                          monte_carlo_samples=1, strategy="smart_grid", seed=42)
+main.run_simulation(params)
+t_first = time.perf_counter()
+print(t_import - t0, t_ready - t_import, t_first - t_ready)
+"""
+
+def run_python(args, env_overrides=None):
+    env = dict(os.environ)
+    env.update(env_overrides or {})
+    return subprocess.run(
+        [sys.executable] + args,
+        cwd=BACKEND_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True
+    )
+
+def measure_importtime(top: int):
+    """Devuelve el tiempo total de importación de main y los módulos más costosos"""
+    proc = run_python(["-X", "importtime", "-c", "import main"], {"SIMULATION_WARMUP": "0"})
+    entries = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        # Formato: "import time:  <propio us> | <acumulado us> | <módulo>"
+        self_us, cumulative_us, name = line.split(":", 1)[1].split("|")
+        entries.append((int(cumulative_us), int(self_us), name.strip()))
+    total = next((c for c, _, n in entries if n == "main"), 0)
+    return total, sorted(entries, reverse=True)[:top]
+
+def measure_first_response(runs: int, warmup: bool):
+    """Tiempo (s) de importación, arranque y primera respuesta en procesos nuevos"""
+    samples = []
+    for _ in range(runs):
+        proc = run_python(["-c", FIRST_RESPONSE_SCRIPT], {"SIMULATION_WARMUP": "1" if warmup else "0"})
+        samples.append([float(x) for x in proc.stdout.split()])
+    return [statistics.median(col) for col in zip(*samples)]
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de arranque en frío")
+    parser.add_argument("--runs", type=int, default=5, help="Procesos por configuración")
+    parser.add_argument("--top", type=int, default=10, help="Módulos más costosos a mostrar")
+    args = parser.parse_args()
+
+    total_us, top_entries = measure_importtime(args.top)
+    print(f"import main: {total_us / 1000:.1f} ms (python -X importtime)")
+    for cumulative_us, self_us, name in top_entries:
+        print(f"  {cumulative_us / 1000:8.1f} ms acumulado  {self_us / 1000:8.1f} ms propio  {name}")
+
+    print()
+    for warmup in (False, True):
+        t_import, t_ready, t_first = measure_first_response(args.runs, warmup)
+        label = "con precalentamiento" if warmup else "sin precalentamiento"
+        print(f"{label} (mediana de {args.runs}):")
+        print(f"  importación:          {t_import * 1000:8.1f} ms")
+        print(f"  arranque (lifespan):  {t_ready * 1000:8.1f} ms")
+        print(f"  primera respuesta:    {t_first * 1000:8.1f} ms")
+        print(f"  total hasta respuesta:{(t_import + t_ready + t_first) * 1000:8.1f} ms")
+
+if __name__ == "__main__":
+    main()
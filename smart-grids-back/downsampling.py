@@ -0,0 +1,155 @@
+"""
+Reducción de series temporales para los gráficos del dashboard.
+
+Todas las series de un resultado se reducen a los mismos índices, para que
+DemandChart.jsx pueda seguir combinándolas punto a punto; `time_index` indica
+la hora de la simulación de cada punto conservado.
+
+Métodos:
+- 'minmax': en cada bloque de horas conserva el mínimo y el máximo de cada
+  serie graficada (demanda, demanda de referencia y precio), de modo que
+  ningún pico se pierde (si max_points no alcanza para todas, solo los de la
+  demanda). Totalmente vectorizado.
+- 'lttb': Largest-Triangle-Three-Buckets sobre la serie de demanda; conserva
+  mejor la forma visual, pero solo garantiza los picos de esa serie.
+"""
+import numpy as np
+
+DOWNSAMPLING_METHODS = ("minmax", "lttb")
+
+def minmax_indices(series: np.ndarray, max_points: int) -> np.ndarray:
+    """
+    Índices del mínimo y el máximo de cada serie en cada bloque, más el primer
+    y el último punto. Si max_points no alcanza para un bloque con todas las
+    series, solo se usa la primera.
+
+    Args:
+        series: Arreglo (series x puntos); la primera es la demanda
+        max_points: Número máximo de índices devueltos
+
+    Returns:
+        Índices ordenados y únicos (como máximo max_points)
+    """
+    series = np.atleast_2d(np.asarray(series, dtype=np.float64))
+    num_series, n = series.shape
+    if n <= max_points:
+        return np.arange(n)
+
+    if 2 + 2 * num_series > max_points:
+        series = series[:1]
+        num_series = 1
+
+    # Dos puntos por serie y bloque, reservando el primero y el último
+    buckets = max(1, (max_points - 2) // (2 * num_series))
+    width = -(-n // buckets)
+    buckets = -(-n // width)
+    # Rellenar con el último valor: argmin/argmax devuelven la primera aparición
+    padded = np.pad(series, ((0, 0), (0, buckets * width - n)), mode="edge")
+    padded = padded.reshape(num_series, buckets, width)
+    offsets = np.arange(buckets) * width
+    indices = np.concatenate((
+        [0, n - 1],
+        (padded.argmin(axis=2) + offsets).ravel(),
+        (padded.argmax(axis=2) + offsets).ravel()
+    ))
+    indices = np.unique(np.minimum(indices, n - 1))
+    if len(indices) > max_points:
+        # Menos de 4 puntos: el primero, el último y el pico de la demanda
+        indices = np.unique([0, int(series[0].argmax()), n - 1])[:max_points]
+    return indices
+
+def lttb_indices(y: np.ndarray, max_points: int) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets: en cada bloque conserva el punto que forma
+    el triángulo de mayor área con el punto elegido en el bloque anterior y la
+    media del bloque siguiente.
+
+    Los límites de los bloques y las medias se calculan vectorizados; solo la
+    elección del punto depende del bloque anterior (un paso por bloque).
+
+    Returns:
+        Índices ordenados (como máximo max_points, al menos 3)
+    """
+    y = np.asarray(y, dtype=np.float64)
+    n = y.shape[0]
+    max_points = max(3, max_points)
+    if n <= max_points:
+        return np.arange(n)
+
+    # Bloques interiores [edges[i], edges[i + 1]) entre el primer y el último punto
+    edges = (np.floor(np.arange(max_points - 1) * ((n - 2) / (max_points - 2))) + 1).astype(np.int64)
+    edges[-1] = n - 1
+    cumulative_x = np.concatenate(([0.0], np.cumsum(np.arange(n, dtype=np.float64))))
+    cumulative_y = np.concatenate(([0.0], np.cumsum(y)))
+
+    # Media de cada bloque siguiente (para el último bloque, el último punto)
+    next_start = np.append(edges[1:-1], n - 1)
+    next_end = np.append(edges[2:], n)
+    sizes = next_end - next_start
+    avg_x = (cumulative_x[next_end] - cumulative_x[next_start]) / sizes
+    avg_y = (cumulative_y[next_end] - cumulative_y[next_start]) / sizes
+
+    indices = np.empty(max_points, dtype=np.int64)
+    indices[0] = 0
+    indices[-1] = n - 1
+    previous = 0
+    for i in range(max_points - 2):
+        start, end = edges[i], edges[i + 1]
+        x_range = np.arange(start, end)
+        areas = np.abs(
+            (previous - avg_x[i]) * (y[start:end] - y[previous]) -
+            (previous - x_range) * (avg_y[i] - y[previous])
+        )
+        previous = start + int(np.argmax(areas))
+        indices[i + 1] = previous
+    return indices
+
+def downsample_result(result: dict, max_points: int, method: str = "minmax") -> dict:
+    """
+    Copia del resultado con time_series, time_series_std, price_series,
+    fixed_demand.time_series y las historias de final_energy_system reducidas
+    a los mismos índices (como máximo max_points), más `time_index`.
+    El resultado original no se modifica.
+    """
+    if method not in DOWNSAMPLING_METHODS:
+        raise ValueError(f"Unknown downsampling method '{method}'. Expected one of {DOWNSAMPLING_METHODS}")
+
+    time_series = np.asarray(result["time_series"], dtype=np.float64)
+    n = time_series.shape[0]
+    if max_points is None or n <= max_points:
+        return result
+
+    fixed_demand = result.get("fixed_demand")
+    charted = [time_series]
+    if fixed_demand and len(fixed_demand["time_series"]) == n:
+        charted.append(fixed_demand["time_series"])
+    if result.get("price_series") is not None and len(result["price_series"]) == n:
+        charted.append(result["price_series"])
+
+    if method == "lttb":
+        indices = lttb_indices(time_series, max_points)
+    else:
+        indices = minmax_indices(np.array(charted), max_points)
+
+    def take(values):
+        if values is None or len(values) != n:
+            return values
+        return np.asarray(values)[indices].tolist()
+
+    downsampled = dict(result)
+    downsampled["time_index"] = indices.tolist()
+    downsampled["time_series"] = time_series[indices].tolist()
+    downsampled["time_series_std"] = take(result.get("time_series_std"))
+    downsampled["price_series"] = take(result.get("price_series"))
+    if fixed_demand:
+        downsampled["fixed_demand"] = dict(fixed_demand, time_series=take(fixed_demand["time_series"]))
+
+    # Historias del sistema energético: valor inicial + estado tras cada hora
+    final_energy_system = result.get("final_energy_system")
+    if final_energy_system:
+        history_indices = np.concatenate(([0], indices + 1))
+        downsampled["final_energy_system"] = {
+            name: np.asarray(history)[history_indices].tolist() if len(history) == n + 1 else history
+            for name, history in final_energy_system.items()
+        }
+    return downsampled
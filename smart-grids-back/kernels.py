@@ -0,0 +1,174 @@
+"""
+Kernel numérico del bucle horario de simulate_demand_single_run().
+
+El kernel implementa las reglas de las estrategias 'fixed', 'demand_response'
+y 'smart_grid' junto con la dinámica de EnergySystem sobre índices enteros de
+estado y arreglos preasignados. Como cada estrategia escala los consumos de
+cada tipo por un mismo factor, basta con la suma horaria de cada tipo: el
+resultado coincide con la implementación de referencia salvo redondeo.
+
+Backends disponibles (variable de entorno SIMULATION_KERNEL o set_backend()):
+- 'reference': bucle original en Python (por defecto)
+- 'numpy': este kernel interpretado, sin dependencias adicionales
+- 'numba': este kernel compilado con numba.njit (si numba no está instalado
+  se usa 'numpy')
+"""
+import logging
+import os
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+KERNEL_BACKENDS = ("reference", "numpy", "numba")
+
+# Códigos de estrategia del kernel (estrategias no reconocidas se tratan como 'fixed')
+STRATEGY_CODES = {"fixed": 0, "demand_response": 1, "smart_grid": 2}
+
+# Tablas por índice de estado, en el orden de simulation.MARKOV_STATES:
+# very_low, low, medium_low, medium, medium_high, high, peak
+DR_PRICE_MULTIPLIERS = np.array([0.7, 0.8, 0.9, 1.0, 1.2, 1.4, 1.7])
+SMART_PRICE_MULTIPLIERS = np.array([0.85, 0.90, 0.95, 1.0, 1.05, 1.15, 1.25])
+STATE_ELASTICITY_MULTIPLIERS = np.array([0.1, 0.3, 0.5, 0.8, 1.1, 1.4, 1.8])
+
+def simulate_hours_kernel(strategy_code, state_indices, state_multipliers,
+                          home_sums, commercial_sums, industrial_sums,
+                          base_price, price, renewable, storage,
+                          learning_rate, storage_growth_rate, max_demand,
+                          demand_out, price_out, emission_out,
+                          price_history_out, renewable_history_out, storage_history_out,
+                          home_scale_out, commercial_scale_out, industrial_scale_out):
+    """
+    Simula len(state_indices) horas escribiendo en los arreglos *_out.
+
+    Args:
+        strategy_code: Código de STRATEGY_CODES
+        state_indices: Índice de estado de Markov por hora
+        state_multipliers: Multiplicador de demanda por hora
+        home_sums, commercial_sums, industrial_sums: Consumo base total por hora y tipo
+        base_price: Precio de referencia de la ejecución
+        price, renewable, storage: Stocks iniciales del sistema energético
+        learning_rate, storage_growth_rate: Tasas iniciales (las estrategias las sobrescriben)
+        max_demand: Demanda máxima acumulada hasta ahora
+        *_scale_out: Factor final (estrategia x multiplicador de Markov) aplicado
+            al consumo base de cada tipo en cada hora
+
+    Returns:
+        Tupla (max_demand, price, renewable, storage, learning_rate, storage_growth_rate) final
+    """
+    if strategy_code == 2:
+        learning_rate = 0.015
+        storage_growth_rate = 0.012
+    elif strategy_code == 1:
+        learning_rate = 0.012
+        storage_growth_rate = 0.010
+
+    for h in range(state_indices.shape[0]):
+        s = state_indices[h]
+        home_factor = 1.0
+        commercial_factor = 1.0
+        industrial_factor = 1.0
+        home_elasticity = 0.0
+        commercial_elasticity = 0.0
+        industrial_elasticity = 0.0
+        current_price = base_price
+
+        if strategy_code == 1 or strategy_code == 2:
+            if strategy_code == 1:
+                current_price = base_price * DR_PRICE_MULTIPLIERS[s]
+            else:
+                current_price = price * SMART_PRICE_MULTIPLIERS[s]
+
+            # calculate_consumer_elasticity() para hogares, comercios e industrias
+            elasticity_multiplier = STATE_ELASTICITY_MULTIPLIERS[s]
+            price_change_percent = (current_price - base_price) / base_price
+            home_elasticity = max(-0.4, min(0.2, -0.6 * elasticity_multiplier * price_change_percent))
+            commercial_elasticity = max(-0.4, min(0.2, -0.4 * elasticity_multiplier * price_change_percent))
+            industrial_elasticity = max(-0.4, min(0.2, -0.25 * elasticity_multiplier * price_change_percent))
+
+        if strategy_code == 1:
+            home_factor = 1.0 + home_elasticity
+            commercial_factor = 1.0 + commercial_elasticity
+            industrial_factor = 1.0 + industrial_elasticity
+
+        elif strategy_code == 2:
+            # Elasticidades mejoradas por información y automatización
+            home_elasticity = max(-0.4, min(0.15, home_elasticity * 1.5))
+            commercial_elasticity = max(-0.35, min(0.12, commercial_elasticity * 1.3))
+            industrial_elasticity = max(-0.25, min(0.1, industrial_elasticity * 1.2))
+
+            if s >= 5:
+                # high / peak: almacenamiento + solar + gestión activa
+                factor = 1.0 - min(0.45, storage * 0.6 + renewable * 0.3 + 0.15)
+            elif s <= 1:
+                # very_low / low: carga de almacenamiento + desplazamiento de demanda
+                factor = 1.0 + (storage * 0.4 + 0.25)
+            elif s == 4:
+                # medium_high: gestión predictiva suave
+                factor = 1.0 - 0.1
+            else:
+                # Demanda normal: optimización de rutina
+                factor = 1.0 - 0.05
+
+            home_factor = (1.0 + home_elasticity) * factor
+            commercial_factor = (1.0 + commercial_elasticity) * factor
+            industrial_factor = (1.0 + industrial_elasticity) * factor
+
+        total_demand = (home_sums[h] * home_factor + commercial_sums[h] * commercial_factor +
+                        industrial_sums[h] * industrial_factor) * state_multipliers[h]
+        max_demand = max(max_demand, total_demand)
+
+        # EnergySystem.update()
+        demand_ratio = total_demand / max_demand if max_demand > 0 else 0.5
+        price_change = (demand_ratio - 0.5) * 0.05
+        adoption_change = renewable * learning_rate * (1 - renewable) * (1 + price / 0.15)
+        storage_change = storage * storage_growth_rate * (1 - storage) * (1 + renewable)
+        price = max(0.08, min(0.30, price + price_change))
+        renewable = min(0.9, renewable + adoption_change)
+        storage = min(0.3, storage + storage_change)
+
+        demand_out[h] = total_demand
+        price_out[h] = current_price
+        emission_out[h] = 0.5 * (1 - renewable)
+        price_history_out[h] = price
+        renewable_history_out[h] = renewable
+        storage_history_out[h] = storage
+        home_scale_out[h] = home_factor * state_multipliers[h]
+        commercial_scale_out[h] = commercial_factor * state_multipliers[h]
+        industrial_scale_out[h] = industrial_factor * state_multipliers[h]
+
+    return max_demand, price, renewable, storage, learning_rate, storage_growth_rate
+
+_backend = "reference"
+_compiled_kernel = None
+
+def set_backend(name: str):
+    """Selecciona el backend del bucle horario en tiempo de ejecución"""
+    global _backend
+    if name not in KERNEL_BACKENDS:
+        raise ValueError(f"Unknown kernel backend '{name}'. Expected one of {KERNEL_BACKENDS}")
+    _backend = name
+
+def get_backend() -> str:
+    return _backend
+
+def get_kernel(backend: str = None):
+    """
+    Devuelve la función kernel para el backend indicado (por defecto el activo),
+    o None para el bucle de referencia. numba se importa solo al pedirlo.
+    """
+    global _compiled_kernel
+    backend = backend or _backend
+    if backend == "reference":
+        return None
+    if backend == "numba":
+        if _compiled_kernel is None:
+            try:
+                import numba
+            except ImportError:
+                logger.warning("numba is not installed; using the NumPy kernel")
+                return simulate_hours_kernel
+            _compiled_kernel = numba.njit(cache=True)(simulate_hours_kernel)
+        return _compiled_kernel
+    return simulate_hours_kernel
+
+set_backend(os.getenv("SIMULATION_KERNEL", "reference"))
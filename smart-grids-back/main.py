@@ -1,15 +1,32 @@
-from fastapi import FastAPI, HTTPException
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import Annotated, Literal, Optional
+from fastapi import FastAPI, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import RedirectResponse
-from models import SimulationParams, SimulationResult
-from simulation import simulate_demand
+from downsampling import downsample_result
+from models import SimulationParams, SimulationResult, SimulationSnapshot
+from profiles import LoadProfileError
+from simulation import simulate_demand, warm_up
 import logging
+import os
+import time
+import uuid
 
 # Configurar logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Precalentar el motor al arrancar el worker (desactivable con SIMULATION_WARMUP=0)
+    if os.getenv("SIMULATION_WARMUP", "1") != "0":
+        start = time.perf_counter()
+        warm_up()
+        logger.info(f"Simulation engine warmed up in {(time.perf_counter() - start) * 1000:.1f} ms")
+    yield
+
+app = FastAPI(lifespan=lifespan)
 
 # CORS para React frontend
 app.add_middleware(
@@ -19,8 +36,44 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Snapshots recientes en memoria (por worker) para continuar simulaciones por id
+SNAPSHOT_STORE_SIZE = int(os.getenv("SNAPSHOT_STORE_SIZE", "256"))
+snapshot_store = OrderedDict()
+
+def store_snapshot(snapshot: dict) -> str:
+    snapshot_id = uuid.uuid4().hex
+    snapshot_store[snapshot_id] = snapshot
+    while len(snapshot_store) > SNAPSHOT_STORE_SIZE:
+        snapshot_store.popitem(last=False)
+    return snapshot_id
+
+def get_stored_snapshot(snapshot_id: str) -> dict:
+    snapshot = snapshot_store.get(snapshot_id)
+    if snapshot is None:
+        raise HTTPException(status_code=404, detail=f"Snapshot not found: {snapshot_id}")
+    return snapshot
+
+# Resultados recientes en memoria (por worker): series a resolución completa y
+# métricas. Los datos de red y el snapshot (guardado aparte) no se conservan
+RESULT_STORE_SIZE = int(os.getenv("RESULT_STORE_SIZE", "64"))
+UNSTORED_RESULT_FIELDS = ("network_data", "snapshot")
+result_store = OrderedDict()
+
+def store_result(result: dict) -> str:
+    simulation_id = uuid.uuid4().hex
+    result_store[simulation_id] = {
+        key: value for key, value in result.items() if key not in UNSTORED_RESULT_FIELDS
+    }
+    while len(result_store) > RESULT_STORE_SIZE:
+        result_store.popitem(last=False)
+    return simulation_id
+
+# Reducción opcional de las series para los gráficos (ver downsampling.py)
+MaxPoints = Annotated[Optional[int], Query(ge=3, description="Puntos máximos por serie temporal")]
+DownsamplingMethod = Annotated[Literal["minmax", "lttb"], Query(description="Método de reducción de las series")]
+
 @app.post("/simulate", response_model=SimulationResult)
-def run_simulation(params: SimulationParams):
+def run_simulation(params: SimulationParams, max_points: MaxPoints = None, method: DownsamplingMethod = "minmax"):
     try:
         logger.info(f"Executing simulation with params: {params}")
         result = simulate_demand(params, params.strategy)
@@ -38,11 +91,38 @@ def run_simulation(params: SimulationParams):
         if "fixed_demand" in result and result["fixed_demand"] is not None:
             logger.info(f"Fixed demand data available for comparison. Peak: {result['fixed_demand'].get('peak_demand')}")
         
-        return result
+        if result.get("snapshot") is not None:
+            result["snapshot_id"] = store_snapshot(result["snapshot"])
+        result["simulation_id"] = store_result(result)
+        
+        return downsample_result(result, max_points, method)
+    except LoadProfileError as e:
+        # Perfil inexistente, sin convertir (python profiles.py convert) o fuera de rango
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error in simulation: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Simulation error: {str(e)}")
 
+@app.post("/simulate/continue/{snapshot_id}", response_model=SimulationResult)
+def continue_simulation(snapshot_id: str, params: SimulationParams,
+                        max_points: MaxPoints = None, method: DownsamplingMethod = "minmax"):
+    # Continúa desde el estado final de una simulación previa (p. ej. el siguiente día)
+    snapshot = get_stored_snapshot(snapshot_id)
+    logger.info(f"Continuing simulation from snapshot {snapshot_id} (elapsed hours: {snapshot['elapsed_hours']})")
+    return run_simulation(params.model_copy(update={"snapshot": SimulationSnapshot(**snapshot)}), max_points, method)
+
+@app.get("/simulations/{simulation_id}", response_model=SimulationResult)
+def get_simulation(simulation_id: str, max_points: MaxPoints = None, method: DownsamplingMethod = "minmax"):
+    # Resultado guardado, con la resolución pedida
+    result = result_store.get(simulation_id)
+    if result is None:
+        raise HTTPException(status_code=404, detail=f"Simulation not found: {simulation_id}")
+    return downsample_result(result, max_points, method)
+
+@app.get("/snapshots/{snapshot_id}", response_model=SimulationSnapshot)
+def get_snapshot(snapshot_id: str):
+    return get_stored_snapshot(snapshot_id)
+
 @app.get("/health")
 def health_check():
     return {"status": "ok"}
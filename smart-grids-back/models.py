@@ -1,6 +1,81 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator, model_validator
+from datetime import datetime
+import base64
+import binascii
 from typing import List, Literal, Optional, Dict
 
+class EnergySystemState(BaseModel):
+    price: float
+    renewable_adoption: float 
+    storage_capacity: float
+
+class SimulationSnapshot(BaseModel):
+    """Estado compacto para continuar una simulación (ver EnergySystem.to_snapshot)"""
+    energy_system: EnergySystemState
+    max_demand: float  # Demanda máxima acumulada (referencia para la dinámica de precios)
+    markov_state: Literal["very_low", "low", "medium_low", "medium", "medium_high", "high", "peak"]  # Último estado de Markov
+    hour: int = Field(ge=0, le=23)  # Hora del día en la que continúa la simulación
+    elapsed_hours: int = Field(ge=0)  # Horas simuladas desde el inicio de la serie
+    rng_state: Optional[str] = None  # Estado serializado de np.random (simulation.encode_rng_state)
+
+    @field_validator("rng_state")
+    @classmethod
+    def check_rng_state(cls, value):
+        # "<nombre>:<pos>:<has_gauss>:<cached_gaussian>:<624 claves uint32 en base64>"
+        if value is None:
+            return value
+        parts = value.split(":", 4)
+        if len(parts) != 5 or parts[0] != "MT19937":
+            raise ValueError("rng_state must be 'MT19937:<pos>:<has_gauss>:<cached_gaussian>:<keys>'")
+        try:
+            pos, has_gauss = int(parts[1]), int(parts[2])
+            float(parts[3])
+            keys = base64.b64decode(parts[4], validate=True)
+        except (ValueError, binascii.Error):
+            raise ValueError("rng_state has malformed fields")
+        if not 0 <= pos <= 624 or has_gauss not in (0, 1) or len(keys) != 624 * 4:
+            raise ValueError("rng_state is not a valid MT19937 state")
+        return value
+
+class TopologyParams(BaseModel):
+    """
+    Topología consumidores -> alimentadores -> subestaciones: asignación
+    aleatoria (sintética) o explícita con consumer_feeders / feeder_substations.
+    Los consumidores se numeran hogares, comercios e industrias, en ese orden.
+    """
+    feeders: int = Field(ge=1)
+    substations: int = Field(default=1, ge=1)
+    capacity_factor: float = Field(default=1.5, gt=0)  # Capacidad / consumo nominal conectado
+    seed: Optional[int] = None  # Semilla de la asignación aleatoria (por defecto, la de la simulación)
+    consumer_feeders: Optional[List[int]] = None  # Alimentador de cada consumidor
+    feeder_substations: Optional[List[int]] = None  # Subestación de cada alimentador
+    feeder_capacities: Optional[List[float]] = None  # kW (por defecto, capacity_factor x consumo nominal)
+    substation_capacities: Optional[List[float]] = None  # kW (ídem)
+
+    @model_validator(mode="after")
+    def check_explicit_topology(self):
+        for name, parents, nodes in (("consumer_feeders", self.consumer_feeders, self.feeders),
+                                     ("feeder_substations", self.feeder_substations, self.substations)):
+            if parents is not None and any(not 0 <= parent < nodes for parent in parents):
+                raise ValueError(f"{name} entries must be between 0 and {nodes - 1}")
+        for name, values, expected in (("feeder_substations", self.feeder_substations, self.feeders),
+                                       ("feeder_capacities", self.feeder_capacities, self.feeders),
+                                       ("substation_capacities", self.substation_capacities, self.substations)):
+            if values is not None and len(values) != expected:
+                raise ValueError(f"{name} must have {expected} entries")
+        for name, values in (("feeder_capacities", self.feeder_capacities),
+                             ("substation_capacities", self.substation_capacities)):
+            if values is not None and any(value <= 0 for value in values):
+                raise ValueError(f"{name} must be positive")
+        return self
+
+class DistributedParams(BaseModel):
+    """Reparto de las muestras Monte Carlo entre workers (cola SIMULATION_QUEUE)"""
+    chunk_size: int = Field(default=10, ge=1)  # Muestras por tarea
+    timeout: float = Field(default=3600, gt=0)  # Espera máxima por los resultados (s)
+    poll_interval: float = Field(default=0.5, gt=0)  # Intervalo de consulta de la cola (s)
+    local_worker: bool = True  # El coordinador también ejecuta tareas mientras espera
+
 class SimulationParams(BaseModel):
     num_homes: int = Field(alias="homes")
     num_commercial: int = Field(alias="businesses")
@@ -11,16 +86,25 @@ class SimulationParams(BaseModel):
     hour_start: int = Field(default=8, alias="start_hour")
     day_type: Literal["weekday", "weekend"] = "weekday"
     seed: Optional[int] = Field(default=None)  # Semilla para reproducibilidad, por defecto None
+    snapshot: Optional[SimulationSnapshot] = None  # Continuar desde un snapshot previo
+    topology: Optional[TopologyParams] = None  # Agregar la carga por alimentador y subestación
+    load_profile: Optional[str] = None  # Perfil medido registrado (PROFILE_DIR) como consumo base
+    profile_start: Optional[datetime] = None  # Inicio dentro del perfil (por defecto, su primera hora)
+    distributed: Optional[DistributedParams] = None  # Monte Carlo distribuido mediante cola de trabajo
+    precision: Literal["float64", "float32"] = "float64"  # Precisión de los arreglos (totales siempre en float64)
+
+    @model_validator(mode="after")
+    def check_topology_consumers(self):
+        consumers = self.num_homes + self.num_commercial + self.num_industrial
+        if self.topology is not None and self.topology.consumer_feeders is not None \
+                and len(self.topology.consumer_feeders) != consumers:
+            raise ValueError(f"topology.consumer_feeders must have one entry per consumer ({consumers})")
+        return self
 
     class Config:
         validate_by_name = True
         populate_by_name = True  # Reemplaza allow_population_by_field_name
 
-class EnergySystemState(BaseModel):
-    price: float
-    renewable_adoption: float 
-    storage_capacity: float
-
 class MonteCarloStats(BaseModel):
     mean: float
     std_dev: float
@@ -36,6 +120,22 @@ class NetworkData(BaseModel):
     businesses: List[ConsumerNode]
     industries: List[ConsumerNode]
 
+class NodeLoadStats(BaseModel):
+    id: str
+    peak_load: float
+    capacity: float
+    overload_count: int  # Horas por encima de la capacidad, sumadas sobre las muestras
+
+class TopologyLevelStats(BaseModel):
+    level: str
+    nodes: List[NodeLoadStats]
+    overloaded_nodes: int
+
+class TopologyResult(BaseModel):
+    samples: int
+    hours: int
+    levels: List[TopologyLevelStats]
+
 class FixedDemandData(BaseModel):
     peak_demand: float
     average_demand: float
@@ -45,6 +145,7 @@ class SimulationResult(BaseModel):
     time_series: List[float]
     time_series_std: Optional[List[float]] = None
     price_series: Optional[List[float]] = None
+    average_price: Optional[float] = None  # Precio medio de la serie completa (no de la reducida)
     peak_demand: float
     peak_demand_std: Optional[float] = None
     peak_demand_confidence: Optional[float] = None
@@ -58,6 +159,11 @@ class SimulationResult(BaseModel):
     monte_carlo_samples: Optional[int] = None
     fixed_demand: Optional[FixedDemandData] = None
     network_data: Optional[NetworkData] = None
+    topology: Optional[TopologyResult] = None  # Picos y sobrecargas por nodo de la red
     final_energy_system: Optional[Dict] = None
     strategy: Optional[str] = None  # Estrategia utilizada
-    hours: Optional[int] = None  # Número de horas simuladas
\ No newline at end of file
+    hours: Optional[int] = None  # Número de horas simuladas
+    snapshot: Optional[SimulationSnapshot] = None  # Estado final para continuar la simulación
+    snapshot_id: Optional[str] = None  # Identificador del snapshot guardado en el servidor
+    simulation_id: Optional[str] = None  # Identificador del resultado guardado (GET /simulations/{id})
+    time_index: Optional[List[int]] = None  # Hora de cada punto si las series se redujeron (max_points)
\ No newline at end of file
@@ -0,0 +1,57 @@
+"""
+Comprobación del modo float32 (SimulationParams.precision) frente a float64.
+
+Usado por benchmarks/precision.py y tests/test_precision.py.
+"""
+import numpy as np
+
+from models import SimulationParams
+from simulation import PRECISION_DTYPES, simulate_demand
+
+# Métricas vigiladas por validate_precision()
+PRECISION_METRICS = ("peak_demand", "average_demand", "reduced_emissions")
+
+def validate_precision(params=None, rtol: float = 1e-5) -> float:
+    """
+    Compara el modo float32 con float64 (misma semilla, Monte Carlo incluido)
+    para las tres estrategias en peak_demand, average_demand y reduced_emissions.
+
+    Args:
+        params: Parámetros de simulación (por defecto una red mediana de una semana)
+        rtol: Desviación relativa máxima admitida
+
+    Returns:
+        Máxima desviación relativa observada
+
+    Raises:
+        ValueError: Si alguna métrica supera la tolerancia
+    """
+    if params is None:
+        params = SimulationParams(
+            homes=200, businesses=40, industries=10, simulation_hours=168,
+            monte_carlo_samples=4, seed=1234
+        )
+    if params.seed is None:
+        params = params.model_copy(update={"seed": 0})
+
+    state = np.random.get_state()
+    max_error = 0.0
+    try:
+        for strategy in ("fixed", "demand_response", "smart_grid"):
+            results = {
+                precision: simulate_demand(params.model_copy(update={"precision": precision}), strategy)
+                for precision in PRECISION_DTYPES
+            }
+            for key in PRECISION_METRICS:
+                expected, actual = results["float64"][key], results["float32"][key]
+                # Métricas nulas (reduced_emissions con 'fixed') se comparan en valor absoluto
+                error = abs(actual - expected) / max(abs(expected), 1e-9)
+                max_error = max(max_error, error)
+                if error > rtol:
+                    raise ValueError(
+                        f"float32 mode deviates from float64 in '{key}' for strategy '{strategy}': "
+                        f"relative error {error:.3e} > {rtol:.1e}"
+                    )
+    finally:
+        np.random.set_state(state)
+    return max_error
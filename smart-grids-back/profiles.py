@@ -0,0 +1,361 @@
+"""
+Ingesta de perfiles de carga medidos (CSV o Parquet) como fuente alternativa
+de consumo base para la simulación.
+
+Formato de entrada (formato largo, una lectura por fila):
+
+    meter_id,timestamp,kwh[,type]
+
+- `timestamp`: inicio del intervalo, hora local sin zona (p. ej. 2024-01-01T00:15)
+- `kwh`: energía del intervalo (cualquier resolución: 15 min, 30 min, 1 h)
+- `type`: 'home', 'business' o 'industry' (por defecto 'home')
+
+El archivo se lee por bloques y se convierte una sola vez a un almacén
+columnar en disco: una matriz horaria (horas x medidores, float32) en formato
+.npy más un meta.json. Las ejecuciones posteriores la abren con memory-map,
+por lo que solo se leen de disco las horas simuladas y nunca se carga el
+conjunto completo en memoria. La energía horaria (kWh) equivale a la potencia
+media (kW), la misma unidad que generate_base_consumption().
+
+Parquet y la lectura rápida de CSV usan pyarrow si está instalado; sin pyarrow
+el CSV se lee con el módulo csv estándar.
+
+La conversión puede tardar minutos con archivos grandes, por lo que la API no
+la lanza: open_profile() exige un almacén convertido y al día. La conversión
+escribe en un directorio temporal y lo pone en su sitio bajo un lock, de modo
+que dos conversiones simultáneas nunca mezclan sus archivos.
+
+Uso:
+    python profiles.py convert medidores.csv
+"""
+import argparse
+import contextlib
+import csv
+import json
+import os
+import re
+import shutil
+import tempfile
+import numpy as np
+
+METER_COLUMN = "meter_id"
+TIMESTAMP_COLUMN = "timestamp"
+VALUE_COLUMN = "kwh"
+TYPE_COLUMN = "type"
+ENTITY_TYPES = ("home", "business", "industry")
+
+# Filas por bloque al leer el archivo de origen
+CHUNK_ROWS = 1_000_000
+
+# Directorio con los perfiles registrados para la API (ver open_profile)
+PROFILE_DIR = os.getenv("PROFILE_DIR", "profiles")
+
+class LoadProfileError(ValueError):
+    """Perfil inexistente, sin convertir o consultado fuera de su rango (error del cliente)"""
+
+def _chunk_arrays(meter_ids, timestamps, values, types):
+    return (
+        np.asarray(meter_ids).astype(str),
+        np.asarray(timestamps).astype("datetime64[m]"),
+        np.asarray(values, dtype=np.float64),
+        np.asarray(types).astype(str) if types is not None else None
+    )
+
+def _iter_csv_chunks(path, chunk_rows):
+    try:
+        from pyarrow import csv as pa_csv
+    except ImportError:
+        pa_csv = None
+
+    if pa_csv is not None:
+        import pyarrow as pa
+        # Tipos fijos: la inferencia por bloques convertiría IDs como '007' en
+        # enteros y fallaría si un bloque posterior trae IDs alfanuméricos
+        column_types = {METER_COLUMN: pa.string(), TYPE_COLUMN: pa.string(), VALUE_COLUMN: pa.float64()}
+        reader = pa_csv.open_csv(
+            path,
+            read_options=pa_csv.ReadOptions(block_size=64 * 1024 * 1024),
+            convert_options=pa_csv.ConvertOptions(column_types=column_types)
+        )
+        for batch in reader:
+            yield _arrow_batch_arrays(batch)
+        return
+
+    with open(path, newline="") as f:
+        reader = csv.reader(f)
+        header = next(reader)
+        meter_col = header.index(METER_COLUMN)
+        time_col = header.index(TIMESTAMP_COLUMN)
+        value_col = header.index(VALUE_COLUMN)
+        type_col = header.index(TYPE_COLUMN) if TYPE_COLUMN in header else None
+
+        rows = []
+        for row in reader:
+            rows.append(row)
+            if len(rows) == chunk_rows:
+                yield _csv_rows_arrays(rows, meter_col, time_col, value_col, type_col)
+                rows = []
+        if rows:
+            yield _csv_rows_arrays(rows, meter_col, time_col, value_col, type_col)
+
+def _csv_rows_arrays(rows, meter_col, time_col, value_col, type_col):
+    columns = list(zip(*rows))
+    types = columns[type_col] if type_col is not None else None
+    return _chunk_arrays(columns[meter_col], columns[time_col], columns[value_col], types)
+
+def _arrow_batch_arrays(batch):
+    names = batch.schema.names
+
+    def column(name):
+        return batch.column(names.index(name)).to_numpy(zero_copy_only=False)
+
+    types = column(TYPE_COLUMN) if TYPE_COLUMN in names else None
+    return _chunk_arrays(column(METER_COLUMN), column(TIMESTAMP_COLUMN), column(VALUE_COLUMN), types)
+
+def _iter_parquet_chunks(path, chunk_rows):
+    try:
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ImportError("Reading Parquet load profiles requires pyarrow (pip install pyarrow)")
+
+    parquet_file = pq.ParquetFile(path)
+    columns = [METER_COLUMN, TIMESTAMP_COLUMN, VALUE_COLUMN]
+    if TYPE_COLUMN in parquet_file.schema_arrow.names:
+        columns.append(TYPE_COLUMN)
+    for batch in parquet_file.iter_batches(batch_size=chunk_rows, columns=columns):
+        yield _arrow_batch_arrays(batch)
+
+def iter_readings(path, chunk_rows: int = CHUNK_ROWS):
+    """
+    Lee el archivo por bloques.
+
+    Yields:
+        Tuplas (meter_ids, timestamps datetime64[m], kwh, types o None)
+    """
+    if path.endswith(".parquet"):
+        return _iter_parquet_chunks(path, chunk_rows)
+    return _iter_csv_chunks(path, chunk_rows)
+
+def _source_stamp(path) -> dict:
+    stat = os.stat(path)
+    return {"source": os.path.abspath(path), "source_size": stat.st_size, "source_mtime": stat.st_mtime}
+
+def default_cache_dir(path) -> str:
+    return f"{path}.profile"
+
+@contextlib.contextmanager
+def _conversion_lock(cache_dir):
+    """Lock exclusivo entre procesos sobre <cache_dir>.lock (sin fcntl, p. ej. Windows, no bloquea)"""
+    try:
+        import fcntl
+    except ImportError:
+        yield
+        return
+    with open(f"{cache_dir}.lock", "w") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+def _replace_dir(new_dir, cache_dir):
+    # Un directorio no vacío no se puede sustituir con un único rename: apartar
+    # el anterior y borrarlo después (los memory-maps abiertos siguen siendo válidos)
+    old_dir = None
+    if os.path.exists(cache_dir):
+        old_dir = tempfile.mkdtemp(prefix=os.path.basename(cache_dir) + ".", suffix=".old",
+                                   dir=os.path.dirname(os.path.abspath(cache_dir)))
+        os.rename(cache_dir, os.path.join(old_dir, "store"))
+    os.rename(new_dir, cache_dir)
+    if old_dir is not None:
+        shutil.rmtree(old_dir, ignore_errors=True)
+
+def convert_profile(path, cache_dir=None, chunk_rows: int = CHUNK_ROWS) -> str:
+    """
+    Convierte un archivo de lecturas al almacén horario en disco.
+
+    Se escribe en un directorio temporal junto a `cache_dir` que sustituye al
+    almacén anterior al terminar, todo bajo un lock entre procesos.
+
+    Returns:
+        Directorio del almacén convertido
+    """
+    cache_dir = cache_dir or default_cache_dir(path)
+    with _conversion_lock(cache_dir):
+        tmp_dir = tempfile.mkdtemp(prefix=os.path.basename(cache_dir) + ".", suffix=".tmp",
+                                   dir=os.path.dirname(os.path.abspath(cache_dir)))
+        try:
+            _write_store(path, tmp_dir, chunk_rows)
+            _replace_dir(tmp_dir, cache_dir)
+        except BaseException:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            raise
+    return cache_dir
+
+def _write_store(path, cache_dir, chunk_rows):
+    """
+    Dos pasadas por bloques: la primera descubre medidores, tipos y rango de
+    fechas; la segunda acumula cada lectura en su hora directamente sobre el
+    .npy mapeado en memoria.
+    """
+
+    meter_index = {}
+    meter_types = []
+    start = end = None
+    for meter_ids, timestamps, _, types in iter_readings(path, chunk_rows):
+        unique_ids, first = np.unique(meter_ids, return_index=True)
+        for meter_id, i in zip(unique_ids.tolist(), first.tolist()):
+            if meter_id not in meter_index:
+                meter_index[meter_id] = len(meter_index)
+                meter_type = types[i] if types is not None else "home"
+                if meter_type not in ENTITY_TYPES:
+                    raise ValueError(f"Unknown meter type '{meter_type}' for meter '{meter_id}'")
+                meter_types.append(meter_type)
+        chunk_start, chunk_end = timestamps.min(), timestamps.max()
+        start = chunk_start if start is None else min(start, chunk_start)
+        end = chunk_end if end is None else max(end, chunk_end)
+
+    if not meter_index:
+        raise ValueError(f"No readings found in {path}")
+
+    start_hour = start.astype("datetime64[h]")
+    hours = int((end.astype("datetime64[h]") - start_hour).astype(int)) + 1
+    hourly_path = os.path.join(cache_dir, "hourly.npy")
+    hourly = np.lib.format.open_memmap(hourly_path, mode="w+", dtype=np.float32, shape=(hours, len(meter_index)))
+
+    for meter_ids, timestamps, values, _ in iter_readings(path, chunk_rows):
+        unique_ids, inverse = np.unique(meter_ids, return_inverse=True)
+        columns = np.array([meter_index[m] for m in unique_ids.tolist()], dtype=np.int64)[inverse]
+        rows = (timestamps.astype("datetime64[h]") - start_hour).astype(np.int64)
+        np.add.at(hourly, (rows, columns), values.astype(np.float32))
+    hourly.flush()
+    del hourly
+
+    meta = _source_stamp(path)
+    meta.update({
+        "start": str(start_hour),
+        "hours": hours,
+        "meter_ids": list(meter_index),
+        "meter_types": meter_types
+    })
+    with open(os.path.join(cache_dir, "meta.json"), "w") as f:
+        json.dump(meta, f)
+
+class LoadProfileStore:
+    """Almacén horario convertido (horas x medidores), abierto con memory-map"""
+    def __init__(self, cache_dir):
+        with open(os.path.join(cache_dir, "meta.json")) as f:
+            self.meta = json.load(f)
+        self.hourly = np.load(os.path.join(cache_dir, "hourly.npy"), mmap_mode="r")
+        self.start = np.datetime64(self.meta["start"], "h")
+        self.hours = self.meta["hours"]
+        self.meter_ids = self.meta["meter_ids"]
+        meter_types = np.array(self.meta["meter_types"])
+        self._type_columns = {t: np.flatnonzero(meter_types == t) for t in ENTITY_TYPES}
+
+    def is_stale(self, path) -> bool:
+        stamp = _source_stamp(path)
+        return any(self.meta.get(k) != v for k, v in stamp.items())
+
+    def offset(self, start=None) -> int:
+        """Hora del almacén correspondiente a `start` (por defecto, el inicio del perfil)"""
+        if start is None:
+            return 0
+        offset = int((np.datetime64(start, "h") - self.start).astype(int))
+        if not 0 <= offset < self.hours:
+            end = self.start + np.timedelta64(self.hours - 1, "h")
+            raise LoadProfileError(f"profile_start {start} is outside the load profile ({self.start} to {end})")
+        return offset
+
+    def hour_of_day(self, start=None) -> int:
+        return int((self.start + self.offset(start)).astype(object).hour)
+
+    def columns(self, entity_type, num_entities) -> np.ndarray:
+        """Primeros `num_entities` medidores del tipo (cíclicamente si hay menos)"""
+        available = self._type_columns[entity_type]
+        if num_entities == 0:
+            return available[:0]
+        if len(available) == 0:
+            raise ValueError(f"Load profile has no '{entity_type}' meters")
+        return available[np.arange(num_entities) % len(available)]
+
+    def base_source(self, start=None, skip_hours: int = 0, dtype=np.float64):
+        """
+        Fuente de consumo base para simulate_demand_single_run(): devuelve la
+        carga horaria medida de cada entidad en la hora `h` de la simulación.
+        Si la simulación supera el final del perfil, continúa desde el inicio.
+
+        Args:
+            start: Fecha y hora del perfil en la que empieza la serie (None: inicio del perfil)
+            skip_hours: Horas ya simuladas de la serie (al continuar desde un snapshot)
+            dtype: Tipo de los arreglos devueltos (el almacén es float32)
+        """
+        offset = self.offset(start) + skip_hours
+        column_cache = {}
+
+        def source(h, entity_type, num_entities):
+            key = (entity_type, num_entities)
+            if key not in column_cache:
+                column_cache[key] = self.columns(entity_type, num_entities)
+            row = self.hourly[(offset + h) % self.hours]
+            return row[column_cache[key]].astype(dtype)
+
+        return source
+
+def load_profile(path, cache_dir=None, convert: bool = True) -> LoadProfileStore:
+    """
+    Abre el almacén de un archivo de lecturas. Si no existe o está
+    desactualizado, lo convierte (`convert`) o lanza LoadProfileError.
+    """
+    cache_dir = cache_dir or default_cache_dir(path)
+    if os.path.exists(os.path.join(cache_dir, "meta.json")):
+        store = LoadProfileStore(cache_dir)
+        if not store.is_stale(path):
+            return store
+    if not convert:
+        raise LoadProfileError(
+            f"Load profile {path} is not converted or changed since its conversion; "
+            f"run: python profiles.py convert {path}"
+        )
+    convert_profile(path, cache_dir)
+    return LoadProfileStore(cache_dir)
+
+_open_stores = {}
+
+def open_profile(name: str) -> LoadProfileStore:
+    """
+    Abre un perfil registrado por nombre: PROFILE_DIR/<name>.parquet o
+    PROFILE_DIR/<name>.csv, ya convertido con `python profiles.py convert`.
+    Los almacenes abiertos se reutilizan en el proceso.
+    """
+    if not re.fullmatch(r"[\w.-]+", name) or name.startswith("."):
+        raise LoadProfileError(f"Invalid load profile name: {name!r}")
+
+    for extension in (".parquet", ".csv"):
+        path = os.path.join(PROFILE_DIR, name + extension)
+        if os.path.exists(path):
+            break
+    else:
+        raise LoadProfileError(f"Load profile not found: {name}")
+
+    store = _open_stores.get(path)
+    if store is None or store.is_stale(path):
+        store = load_profile(path, convert=False)
+        _open_stores[path] = store
+    return store
+
+def main():
+    parser = argparse.ArgumentParser(description="Conversión de perfiles de carga medidos")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    convert = subparsers.add_parser("convert", help="Convertir CSV/Parquet al almacén horario")
+    convert.add_argument("path")
+    convert.add_argument("--cache-dir", default=None)
+    convert.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS)
+    args = parser.parse_args()
+
+    cache_dir = convert_profile(args.path, args.cache_dir, args.chunk_rows)
+    store = LoadProfileStore(cache_dir)
+    print(f"{cache_dir}: {store.hours} horas x {len(store.meter_ids)} medidores desde {store.start}")
+
+if __name__ == "__main__":
+    main()
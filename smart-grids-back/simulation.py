@@ -1,9 +1,29 @@
 import numpy as np
-from typing import Dict, List, Tuple, Literal
-import simpy
+import base64
+from functools import lru_cache, wraps
+import threading
+from typing import TYPE_CHECKING, Dict, List, Tuple, Literal
 import time
+import uuid
 from datetime import datetime
 from models import SimulationParams
+from simulation_cache import RunCheckpoint, SimulationCache, simulation_cache
+import kernels
+from topology import TopologyLoadCollector, build_topology
+
+if TYPE_CHECKING:
+    from work_queue import Task, WorkQueue
+
+# Precisión de los arreglos de la simulación (SimulationParams.precision)
+PRECISION_DTYPES = {"float64": np.float64, "float32": np.float32}
+
+def simulation_dtype(params):
+    """
+    Tipo de los arreglos por entidad y por hora (consumos base, series de
+    kernels, tensores Monte Carlo y buffers de topología). Los totales de
+    emisiones y costos se acumulan siempre en float64.
+    """
+    return PRECISION_DTYPES[getattr(params, 'precision', 'float64')]
 
 class EnergySystem:
     """Implementación de dinámica de sistemas para el mercado energético"""
@@ -54,14 +74,71 @@ class EnergySystem:
             "storage_capacity": self.storage_capacity
         }
     
+    def to_snapshot(self) -> dict:
+        """Estado compacto del sistema (solo los stocks, sin historiales) para reanudar simulaciones"""
+        return {
+            "price": self.energy_price,
+            "renewable_adoption": self.renewable_adoption,
+            "storage_capacity": self.storage_capacity
+        }
+    
+    @classmethod
+    def from_snapshot(cls, state: dict) -> "EnergySystem":
+        """Reconstruye un sistema a partir de to_snapshot(); los historiales empiezan en ese estado"""
+        return cls(state["price"], state["renewable_adoption"], state["storage_capacity"])
+    
+    def signature(self) -> tuple:
+        """Identifica el estado completo del sistema (clave de caché para ejecuciones sembradas)"""
+        return (
+            self.energy_price, self.renewable_adoption, self.storage_capacity,
+            self.price_sensitivity, self.learning_rate, self.storage_growth_rate,
+            tuple(self.price_history), tuple(self.renewable_history), tuple(self.storage_history)
+        )
+    
     def get_emission_factor(self) -> float:
         """Calcula el factor de emisión basado en la mezcla energética"""
         # Las energías renovables tienen 0 emisiones, mientras las no renovables tienen un factor base
         non_renewable_factor = 0.5  # kg CO2/kWh
         return non_renewable_factor * (1 - self.renewable_adoption)
 
+def encode_rng_state(state) -> str:
+    """
+    Serializa el estado de np.random (MT19937) en una cadena compacta:
+    "<nombre>:<pos>:<has_gauss>:<cached_gaussian>:<claves en base64>"
+    """
+    name, keys, pos, has_gauss, cached_gaussian = state
+    encoded_keys = base64.b64encode(np.asarray(keys, dtype='<u4').tobytes()).decode('ascii')
+    return f"{name}:{pos}:{has_gauss}:{cached_gaussian!r}:{encoded_keys}"
+
+def decode_rng_state(encoded: str):
+    """Inverso de encode_rng_state(), apto para np.random.set_state()"""
+    name, pos, has_gauss, cached_gaussian, encoded_keys = encoded.split(":", 4)
+    keys = np.frombuffer(base64.b64decode(encoded_keys), dtype='<u4').astype(np.uint32)
+    return name, keys, int(pos), int(has_gauss), float(cached_gaussian)
+
+# np.random es global al proceso y el servidor atiende peticiones en varios
+# hilos: los sorteos de una ejecución (y los artefactos sembrados que deja en
+# la caché) no deben intercalarse con los de otra
+_rng_lock = threading.RLock()
+
+def _holding_rng_lock(function):
+    @wraps(function)
+    def wrapper(*args, **kwargs):
+        with _rng_lock:
+            return function(*args, **kwargs)
+    return wrapper
+
+def continuation_seed(seed: int, snapshot: dict) -> int:
+    """
+    Semilla de una continuación sembrada: distinta para cada punto de partida
+    (horas ya simuladas), de modo que encadenar continuaciones con la misma
+    semilla no repite el mismo día. Determinista para (seed, elapsed_hours).
+    """
+    return int(np.random.SeedSequence([seed, snapshot["elapsed_hours"]]).generate_state(1)[0])
+
 # Simular consumo base para cada tipo de usuario con distribuciones más realistas
-def generate_base_consumption(num_entities, entity_type, hour_of_day, day_type="weekday", seed=None):
+def generate_base_consumption(num_entities, entity_type, hour_of_day, day_type="weekday", seed=None,
+                              dtype=np.float64):
     """
     Genera consumos base más realistas utilizando diversas distribuciones estadísticas
     según el tipo de entidad y hora del día.
@@ -72,6 +149,7 @@ def generate_base_consumption(num_entities, entity_type, hour_of_day, day_type="
         hour_of_day: Hora del día (0-23)
         day_type: 'weekday' o 'weekend'
         seed: Semilla para reproducibilidad
+        dtype: Tipo del arreglo devuelto (los sorteos son los mismos en float32)
         
     Returns:
         Array de consumos base
@@ -103,7 +181,7 @@ def generate_base_consumption(num_entities, entity_type, hour_of_day, day_type="
         mix = np.random.choice([0, 1], size=num_entities, p=[0.7, 0.3])
         small_homes = np.random.normal(1.2, 0.25, num_entities) * hour_factor
         large_homes = np.random.normal(2.5, 0.6, num_entities) * hour_factor
-        return np.where(mix == 0, small_homes, large_homes)
+        return np.where(mix == 0, small_homes, large_homes).astype(dtype, copy=False)
     
     elif entity_type == 'business':
         # Distribución log-normal para negocios
@@ -112,7 +190,7 @@ def generate_base_consumption(num_entities, entity_type, hour_of_day, day_type="
         mu = np.log(4.0) - sigma**2/2  # Para que la media sea ~4.0
         base = np.exp(np.random.normal(mu, sigma, num_entities))
         # Aplicar límites y factores
-        return np.clip(base * hour_factor, 2.0, 40.0)
+        return np.clip(base * hour_factor, 2.0, 40.0).astype(dtype, copy=False)
     
     elif entity_type == 'industry':
         # Distribución mixta para industrias
@@ -124,79 +202,92 @@ def generate_base_consumption(num_entities, entity_type, hour_of_day, day_type="
         outlier_values = np.random.uniform(25, 35, num_entities)
         base = np.where(outliers == 1, outlier_values, base)
         # Aplicar factor hora y ajustar rango
-        return np.clip(base * hour_factor, 5.0, 70.0)
+        return np.clip(base * hour_factor, 5.0, 70.0).astype(dtype, copy=False)
     
     # Valor por defecto si ninguno coincide
-    return np.random.normal(loc=5.0, scale=1.0, size=num_entities)
+    return np.random.normal(loc=5.0, scale=1.0, size=num_entities).astype(dtype, copy=False)
+
+# Estados de demanda de la cadena de Markov (el índice de cada estado es su posición)
+MARKOV_STATES = ['very_low', 'low', 'medium_low', 'medium', 'medium_high', 'high', 'peak']
+
+DEMAND_MULTIPLIERS = {
+    'very_low': 0.4,
+    'low': 0.6,
+    'medium_low': 0.8,
+    'medium': 1.0,
+    'medium_high': 1.2,
+    'high': 1.5,
+    'peak': 1.8
+}
 
-def generate_markov_states(steps: int, hour_start: int = 0, day_type: str = 'weekday'):
+MARKOV_STATE_INDEX = {state: i for i, state in enumerate(MARKOV_STATES)}
+
+# Estados iniciales posibles según el periodo del día
+HOUR_BASED_STATES = {
+    "night": ['very_low', 'low', 'medium_low'],
+    "morning": ['low', 'medium_low', 'medium'],
+    "midday": ['medium_low', 'medium', 'medium_high'],
+    "evening": ['medium', 'medium_high', 'high']
+}
+
+@lru_cache(maxsize=None)
+def build_markov_tables(day_type: str = 'weekday'):
     """
-    Genera una secuencia de estados de demanda usando una cadena de Markov mejorada
-    con dependencia temporal (hora del día y tipo de día)
+    Construye (una sola vez por tipo de día) las tablas de la cadena de Markov.
+
+    Las matrices de transición se expanden a un arreglo por hora del día y se
+    validan aquí, de modo que generate_markov_states() no tenga que
+    reconstruirlas ni revalidarlas en cada paso.
 
     Args:
-        steps: Número de pasos (horas) a simular
-        hour_start: Hora del día para iniciar (0-23)
         day_type: 'weekday' o 'weekend'
 
     Returns:
-        Lista de estados y multiplicadores de demanda correspondientes
+        Tupla (matrices por hora con forma (24, 7, 7), multiplicadores por índice de estado)
     """
-    states = ['very_low', 'low', 'medium_low', 'medium', 'medium_high', 'high', 'peak']
-
-    demand_multipliers = {
-        'very_low': 0.4,
-        'low': 0.6,
-        'medium_low': 0.8,
-        'medium': 1.0,
-        'medium_high': 1.2,
-        'high': 1.5,
-        'peak': 1.8
-    }
+    night_matrix = [
+        [0.70, 0.20, 0.10, 0.00, 0.00, 0.00, 0.00],  # very_low
+        [0.20, 0.60, 0.15, 0.05, 0.00, 0.00, 0.00],  # low
+        [0.10, 0.20, 0.60, 0.10, 0.00, 0.00, 0.00],  # medium_low
+        [0.05, 0.15, 0.20, 0.50, 0.10, 0.00, 0.00],  # medium
+        [0.05, 0.10, 0.15, 0.20, 0.40, 0.10, 0.00],  # medium_high
+        [0.10, 0.10, 0.10, 0.20, 0.20, 0.30, 0.00],  # high
+        [0.10, 0.20, 0.20, 0.20, 0.15, 0.10, 0.05]   # peak
+    ]
 
-    night_matrix = {
-        'very_low': [0.70, 0.20, 0.10, 0.00, 0.00, 0.00, 0.00],
-        'low':      [0.20, 0.60, 0.15, 0.05, 0.00, 0.00, 0.00],
-        'medium_low':[0.10, 0.20, 0.60, 0.10, 0.00, 0.00, 0.00],
-        'medium':   [0.05, 0.15, 0.20, 0.50, 0.10, 0.00, 0.00],
-        'medium_high':[0.05, 0.10, 0.15, 0.20, 0.40, 0.10, 0.00],
-        'high':     [0.10, 0.10, 0.10, 0.20, 0.20, 0.30, 0.00],
-        'peak':     [0.10, 0.20, 0.20, 0.20, 0.15, 0.10, 0.05]
-    }
+    morning_matrix = [
+        [0.20, 0.50, 0.20, 0.10, 0.00, 0.00, 0.00],
+        [0.05, 0.30, 0.40, 0.20, 0.05, 0.00, 0.00],
+        [0.00, 0.10, 0.30, 0.40, 0.15, 0.05, 0.00],
+        [0.00, 0.05, 0.15, 0.40, 0.30, 0.10, 0.00],
+        [0.00, 0.00, 0.10, 0.30, 0.35, 0.20, 0.05],
+        [0.00, 0.00, 0.05, 0.15, 0.30, 0.40, 0.10],
+        [0.00, 0.00, 0.00, 0.10, 0.20, 0.30, 0.40]
+    ]
 
-    morning_matrix = {
-        'very_low': [0.20, 0.50, 0.20, 0.10, 0.00, 0.00, 0.00],
-        'low':      [0.05, 0.30, 0.40, 0.20, 0.05, 0.00, 0.00],
-        'medium_low':[0.00, 0.10, 0.30, 0.40, 0.15, 0.05, 0.00],
-        'medium':   [0.00, 0.05, 0.15, 0.40, 0.30, 0.10, 0.00],
-        'medium_high':[0.00, 0.00, 0.10, 0.30, 0.35, 0.20, 0.05],
-        'high':     [0.00, 0.00, 0.05, 0.15, 0.30, 0.40, 0.10],
-        'peak':     [0.00, 0.00, 0.00, 0.10, 0.20, 0.30, 0.40]
-    }
+    midday_matrix = [
+        [0.10, 0.30, 0.40, 0.20, 0.00, 0.00, 0.00],
+        [0.05, 0.20, 0.40, 0.25, 0.10, 0.00, 0.00],
+        [0.00, 0.10, 0.30, 0.40, 0.15, 0.05, 0.00],
+        [0.00, 0.05, 0.15, 0.50, 0.20, 0.10, 0.00],
+        [0.00, 0.00, 0.10, 0.20, 0.40, 0.25, 0.05],
+        [0.00, 0.00, 0.05, 0.15, 0.30, 0.40, 0.10],
+        [0.00, 0.00, 0.00, 0.10, 0.30, 0.40, 0.20]
+    ]
 
-    midday_matrix = {
-        'very_low': [0.10, 0.30, 0.40, 0.20, 0.00, 0.00, 0.00],
-        'low':      [0.05, 0.20, 0.40, 0.25, 0.10, 0.00, 0.00],
-        'medium_low':[0.00, 0.10, 0.30, 0.40, 0.15, 0.05, 0.00],
-        'medium':   [0.00, 0.05, 0.15, 0.50, 0.20, 0.10, 0.00],
-        'medium_high':[0.00, 0.00, 0.10, 0.20, 0.40, 0.25, 0.05],
-        'high':     [0.00, 0.00, 0.05, 0.15, 0.30, 0.40, 0.10],
-        'peak':     [0.00, 0.00, 0.00, 0.10, 0.30, 0.40, 0.20]
-    }
-
-    evening_matrix = {
-        'very_low': [0.05, 0.20, 0.30, 0.30, 0.15, 0.00, 0.00],
-        'low':      [0.00, 0.10, 0.20, 0.40, 0.20, 0.10, 0.00],
-        'medium_low':[0.00, 0.05, 0.15, 0.30, 0.30, 0.15, 0.05],
-        'medium':   [0.00, 0.00, 0.10, 0.20, 0.30, 0.30, 0.10],
-        'medium_high':[0.00, 0.00, 0.05, 0.15, 0.30, 0.30, 0.20],
-        'high':     [0.00, 0.00, 0.00, 0.10, 0.20, 0.40, 0.30],
-        'peak':     [0.00, 0.00, 0.00, 0.05, 0.15, 0.30, 0.50]
-    }
+    evening_matrix = [
+        [0.05, 0.20, 0.30, 0.30, 0.15, 0.00, 0.00],
+        [0.00, 0.10, 0.20, 0.40, 0.20, 0.10, 0.00],
+        [0.00, 0.05, 0.15, 0.30, 0.30, 0.15, 0.05],
+        [0.00, 0.00, 0.10, 0.20, 0.30, 0.30, 0.10],
+        [0.00, 0.00, 0.05, 0.15, 0.30, 0.30, 0.20],
+        [0.00, 0.00, 0.00, 0.10, 0.20, 0.40, 0.30],
+        [0.00, 0.00, 0.00, 0.05, 0.15, 0.30, 0.50]
+    ]
 
     if day_type == 'weekend':
-        new_morning_matrix = {}
-        for k, v in morning_matrix.items():
+        new_morning_matrix = []
+        for v in morning_matrix:
             adjusted = [
                 0.7*v[0] + 0.3*v[1],
                 0.3*v[0] + 0.5*v[1] + 0.2*v[2],
@@ -207,25 +298,31 @@ def generate_markov_states(steps: int, hour_start: int = 0, day_type: str = 'wee
                 0.5*v[5] + 0.5*v[6]
             ]
             total = sum(adjusted)
-            normalized = [x / total for x in adjusted]
-            new_morning_matrix[k] = normalized
+            new_morning_matrix.append([x / total for x in adjusted])
         morning_matrix = new_morning_matrix
 
-    hour_to_matrix = {
-        0: night_matrix, 1: night_matrix, 2: night_matrix, 3: night_matrix, 4: night_matrix, 5: night_matrix,
-        6: morning_matrix, 7: morning_matrix, 8: morning_matrix, 9: morning_matrix, 10: morning_matrix,
-        11: midday_matrix, 12: midday_matrix, 13: midday_matrix, 14: midday_matrix, 15: midday_matrix, 16: midday_matrix,
-        17: evening_matrix, 18: evening_matrix, 19: evening_matrix, 20: evening_matrix, 21: evening_matrix,
-        22: night_matrix, 23: night_matrix
-    }
+    # Matriz aplicable a cada hora del día
+    hour_to_matrix = (
+        [night_matrix] * 6 +      # 0-5
+        [morning_matrix] * 5 +    # 6-10
+        [midday_matrix] * 6 +     # 11-16
+        [evening_matrix] * 5 +    # 17-21
+        [night_matrix] * 2        # 22-23
+    )
+    matrices = np.array(hour_to_matrix, dtype=np.float64)
 
-    hour_based_states = {
-        "night": ['very_low', 'low', 'medium_low'],
-        "morning": ['low', 'medium_low', 'medium'],
-        "midday": ['medium_low', 'medium', 'medium_high'],
-        "evening": ['medium', 'medium_high', 'high']
-    }
+    row_sums = matrices.sum(axis=2)
+    if not np.allclose(row_sums, 1.0, atol=1e-6):
+        hour, state = np.argwhere(~np.isclose(row_sums, 1.0, atol=1e-6))[0]
+        raise ValueError(f"Probabilities for state '{MARKOV_STATES[state]}' at hour {hour} do not sum to 1: {row_sums[hour, state]}")
 
+    multipliers = np.array([DEMAND_MULTIPLIERS[s] for s in MARKOV_STATES], dtype=np.float64)
+    matrices.setflags(write=False)
+    multipliers.setflags(write=False)
+    return matrices, multipliers
+
+def _initial_markov_state(hour_start: int) -> int:
+    """Elige aleatoriamente el estado inicial según el periodo del día de inicio"""
     if hour_start < 6:
         period = "night"
     elif hour_start < 11:
@@ -235,24 +332,160 @@ def generate_markov_states(steps: int, hour_start: int = 0, day_type: str = 'wee
     else:
         period = "evening"
 
-    current = np.random.choice(hour_based_states[period])
+    return MARKOV_STATES.index(np.random.choice(HOUR_BASED_STATES[period]))
+
+def _advance_markov_chain(current: int, steps: int, hour_start: int, offset: int, day_type: str) -> List[int]:
+    """
+    Avanza la cadena `steps` pasos desde el estado `current`.
 
-    state_results = []
-    multiplier_results = []
+    `offset` es el número de pasos ya simulados, para continuar una secuencia
+    existente con la matriz de la hora correcta.
+    """
+    matrices, _ = build_markov_tables(day_type)
+    num_states = len(MARKOV_STATES)
 
-    for i in range(steps):
+    indices = []
+    for i in range(offset, offset + steps):
         current_hour = (hour_start + i) % 24
-        current_matrix = hour_to_matrix[current_hour]
+        current = np.random.choice(num_states, p=matrices[current_hour, current])
+        indices.append(int(current))
+    return indices
 
-        probs = current_matrix[current]
-        if not np.isclose(sum(probs), 1.0, atol=1e-6):
-            raise ValueError(f"Probabilities for state '{current}' at hour {current_hour} do not sum to 1: {sum(probs)}")
+def _markov_states_from_indices(indices: List[int], day_type: str):
+    _, multipliers = build_markov_tables(day_type)
+    return [MARKOV_STATES[i] for i in indices], [float(multipliers[i]) for i in indices]
 
-        current = np.random.choice(states, p=probs)
-        state_results.append(current)
-        multiplier_results.append(demand_multipliers[current])
+def generate_markov_states(steps: int, hour_start: int = 0, day_type: str = 'weekday', initial_state: str = None):
+    """
+    Genera una secuencia de estados de demanda usando una cadena de Markov mejorada
+    con dependencia temporal (hora del día y tipo de día)
 
-    return state_results, multiplier_results
+    Args:
+        steps: Número de pasos (horas) a simular
+        hour_start: Hora del día para iniciar (0-23)
+        day_type: 'weekday' o 'weekend'
+        initial_state: Estado desde el que continuar (None para elegirlo según la hora)
+
+    Returns:
+        Lista de estados y multiplicadores de demanda correspondientes
+    """
+    if initial_state is None:
+        current = _initial_markov_state(hour_start)
+    else:
+        current = MARKOV_STATES.index(initial_state)
+    indices = _advance_markov_chain(current, steps, hour_start, 0, day_type)
+    return _markov_states_from_indices(indices, day_type)
+
+def _cached_markov_states(cache: SimulationCache, seed: int, steps: int, hour_start: int, day_type: str):
+    """
+    Igual que generate_markov_states() justo después de np.random.seed(seed),
+    pero reutilizando la secuencia guardada. Si el horizonte pedido es mayor,
+    solo se generan los pasos nuevos, continuando desde el estado del generador.
+    """
+    key = (seed, hour_start, day_type)
+    artifact = cache.get_markov(key)
+    if artifact is None:
+        current = _initial_markov_state(hour_start)
+        indices = _advance_markov_chain(current, steps, hour_start, 0, day_type)
+        cache.put_markov(key, indices, np.random.get_state())
+    else:
+        indices, rng_state = artifact
+        if len(indices) < steps:
+            np.random.set_state(rng_state)
+            indices = indices + _advance_markov_chain(indices[-1], steps - len(indices), hour_start, len(indices), day_type)
+            cache.put_markov(key, indices, np.random.get_state())
+    return _markov_states_from_indices(indices[:steps], day_type)
+
+def _synthetic_base_source(cache: SimulationCache, day_type, seed, dtype=np.float64):
+    """Fuente de consumo base sintético (generate_base_consumption) para _simulate_hours()"""
+    def source(h, entity_type, num_entities):
+        return _cached_base_consumption(cache, num_entities, entity_type, h % 24, day_type, seed, dtype)
+    return source
+
+def _cached_base_consumption(cache: SimulationCache, num_entities, entity_type, hour_of_day, day_type, seed,
+                             dtype=np.float64):
+    """generate_base_consumption() memorizada para semillas explícitas (la función resiembra en cada llamada)"""
+    if seed is None or not cache.enabled:
+        return generate_base_consumption(num_entities, entity_type, hour_of_day, day_type, seed, dtype)
+
+    key = (seed, num_entities, entity_type, hour_of_day, day_type, np.dtype(dtype).name)
+    consumption = cache.get_base(key)
+    if consumption is None:
+        consumption = generate_base_consumption(num_entities, entity_type, hour_of_day, day_type, seed, dtype)
+        cache.put_base(key, consumption)
+    return consumption
+
+@_holding_rng_lock
+def warm_up():
+    """
+    Precalienta el motor de simulación: construye las tablas de Markov para
+    ambos tipos de día y ejecuta una simulación mínima para que la primera
+    petición real no pague el coste de inicialización. Si hay un kernel
+    compilado activo, se compila y valida aquí.
+    """
+    for day_type in ("weekday", "weekend"):
+        build_markov_tables(day_type)
+
+    if kernels.get_backend() != "reference":
+        validate_kernel_backend(kernels.get_backend())
+
+    params = SimulationParams(homes=1, businesses=1, industries=1, simulation_hours=1, seed=0)
+    state = np.random.get_state()
+    try:
+        simulate_demand_single_run(params, "smart_grid", seed=0)
+    finally:
+        # No alterar el estado aleatorio global del proceso
+        np.random.set_state(state)
+
+@_holding_rng_lock
+def validate_kernel_backend(backend: str, params=None, rtol: float = 1e-9) -> float:
+    """
+    Compara un backend de kernels.py con el bucle de referencia para las tres
+    estrategias, con la misma semilla.
+
+    Args:
+        backend: Backend a validar ('numpy' o 'numba')
+        params: Parámetros de simulación (por defecto una red pequeña de 48 horas)
+        rtol: Tolerancia relativa máxima admitida
+
+    Returns:
+        Máxima desviación relativa observada
+
+    Raises:
+        ValueError: Si alguna serie o métrica supera la tolerancia
+    """
+    if params is None:
+        params = SimulationParams(homes=40, businesses=15, industries=5, simulation_hours=48, seed=1234)
+
+    state = np.random.get_state()
+    previous_backend = kernels.get_backend()
+    max_error = 0.0
+    try:
+        for strategy in ("fixed", "demand_response", "smart_grid"):
+            results = {}
+            for name in ("reference", backend):
+                kernels.set_backend(name)
+                results[name] = simulate_demand_single_run(
+                    params, strategy, seed=params.seed if params.seed is not None else 0,
+                    hour_start=params.hour_start, day_type=params.day_type,
+                    cache=SimulationCache(max_entries=0)
+                )
+            expected, actual = results["reference"], results[backend]
+            for key in ("time_series", "price_series", "peak_demand", "average_demand", "total_emissions"):
+                reference_values = np.atleast_1d(np.asarray(expected[key], dtype=np.float64))
+                values = np.atleast_1d(np.asarray(actual[key], dtype=np.float64))
+                scale = np.maximum(np.abs(reference_values), 1e-12)
+                error = float(np.max(np.abs(values - reference_values) / scale))
+                max_error = max(max_error, error)
+                if error > rtol:
+                    raise ValueError(
+                        f"Kernel backend '{backend}' deviates from reference in '{key}' "
+                        f"for strategy '{strategy}': relative error {error:.3e} > {rtol:.1e}"
+                    )
+    finally:
+        kernels.set_backend(previous_backend)
+        np.random.set_state(state)
+    return max_error
 
 def calculate_consumer_elasticity(consumer_type: str, price: float, state: str, base_price: float = 0.15) -> float:
     """
@@ -298,50 +531,36 @@ def calculate_consumer_elasticity(consumer_type: str, price: float, state: str,
     # Limitar el rango de cambio (más amplio para permitir mejor diferenciación)
     return max(-0.4, min(0.2, demand_change_percent))
 
-def simulate_demand_single_run(params, strategy, energy_system=None, seed=None, hour_start=0, day_type='weekday'):
+def _simulate_hours(params, strategy, energy_system, markov_states, state_multipliers, base_price,
+                    start, end, base_source, max_demand, demand_profile, price_profile, emission_factors,
+                    collector=None):
     """
-    Ejecuta una simulación de demanda eléctrica
-    
-    Args:
-        params: Parámetros de simulación
-        strategy: Estrategia de gestión ('fixed', 'demand_response', 'smart_grid')
-        energy_system: Sistema energético para dinámica de sistemas (opcional)
-        seed: Semilla para reproducibilidad (None para aleatorio)
-        hour_start: Hora de inicio de la simulación (0-23)
-        day_type: 'weekday' o 'weekend'
-        
+    Simula las horas [start, end) aplicando la estrategia y actualizando el
+    sistema energético. Los perfiles se extienden en el lugar.
+
+    `base_source(h, entity_type, num_entities)` devuelve el consumo base de cada
+    entidad en la hora h (sintético o medido). Si se indica un
+    TopologyLoadCollector, recibe la carga por consumidor de cada hora.
+
     Returns:
-        Resultados de la simulación
-    """    
-    # Establecer semilla si se proporciona
-    if seed is not None:
-        np.random.seed(seed)
-    
-    hours = params.hours
-    demand_profile = []
-    price_profile = []
-    emission_factors = []
-    
-    # Inicializar sistema energético si no se proporciona
-    if energy_system is None:
-        energy_system = EnergySystem()
-    
-    # Generar estados de Markov
-    markov_states, state_multipliers = generate_markov_states(hours, hour_start, day_type)
-    
-    # Precio base inicial
-    base_price = energy_system.energy_price
-    
-    max_demand = 0  # Para calcular el máximo durante la simulación
+        Demanda máxima observada hasta `end`
+    """
+    kernel = kernels.get_kernel()
+    if kernel is not None:
+        return _simulate_hours_kernel(
+            kernel, params, strategy, energy_system, markov_states, state_multipliers, base_price,
+            start, end, base_source, max_demand, demand_profile, price_profile, emission_factors,
+            collector
+        )
     
-    for h in range(hours):
+    for h in range(start, end):
         state = markov_states[h]
         state_multiplier = state_multipliers[h]
         
         # Simular consumo base para cada tipo de usuario
-        home_base = generate_base_consumption(params.num_homes, 'home', h % 24, day_type, seed)
-        commercial_base = generate_base_consumption(params.num_commercial, 'business', h % 24, day_type, seed)
-        industrial_base = generate_base_consumption(params.num_industrial, 'industry', h % 24, day_type, seed)
+        home_base = base_source(h, 'home', params.num_homes)
+        commercial_base = base_source(h, 'business', params.num_commercial)
+        industrial_base = base_source(h, 'industry', params.num_industrial)
         
         # Aplicar estrategia de respuesta a la demanda
         if strategy == 'fixed':
@@ -440,8 +659,12 @@ def simulate_demand_single_run(params, strategy, energy_system=None, seed=None,
             industrial_actual = industrial_base
             current_price = base_price
         
-        # Calcular demanda total
-        total_demand = (home_actual.sum() + commercial_actual.sum() + industrial_actual.sum()) * state_multiplier
+        # Calcular demanda total (escalar float64 también en modo float32)
+        total_demand = float((home_actual.sum() + commercial_actual.sum() + industrial_actual.sum()) * state_multiplier)
+        
+        if collector is not None:
+            collector.add(home_actual * state_multiplier, commercial_actual * state_multiplier,
+                          industrial_actual * state_multiplier)
         
         # Actualizar max_demand si es necesario
         max_demand = max(max_demand, total_demand)
@@ -463,23 +686,218 @@ def simulate_demand_single_run(params, strategy, energy_system=None, seed=None,
         demand_profile.append(total_demand)
         price_profile.append(current_price)
         emission_factors.append(energy_system.get_emission_factor())
+
+    return max_demand
+
+def _simulate_hours_kernel(kernel, params, strategy, energy_system, markov_states, state_multipliers, base_price,
+                           start, end, base_source, max_demand, demand_profile, price_profile, emission_factors,
+                           collector=None):
+    """
+    Variante de _simulate_hours() que delega el bucle horario en un kernel de
+    kernels.py. Los consumos base se generan igual (mismo orden de sorteos) y
+    se reducen a su suma horaria por tipo antes de llamar al kernel.
+    """
+    steps = end - start
+    if steps <= 0:
+        return max_demand
+    
+    dtype = simulation_dtype(params)
+    state_indices = np.array([MARKOV_STATE_INDEX[s] for s in markov_states[start:end]], dtype=np.int64)
+    multipliers = np.array(state_multipliers[start:end], dtype=np.float64)
+    home_sums = np.empty(steps, dtype=dtype)
+    commercial_sums = np.empty(steps, dtype=dtype)
+    industrial_sums = np.empty(steps, dtype=dtype)
+    # demanda, precio, factor de emisión, historiales de precio, renovables y
+    # almacenamiento, y factor aplicado al consumo base de cada tipo
+    # (en modo float32, buffers float32; el estado escalar del kernel sigue en float64)
+    outputs = np.empty((9, steps), dtype=dtype)
+    
+    # Con agregación por topología las cargas por consumidor solo se retienen
+    # durante un bloque de horas del tamaño del buffer del colector; el kernel
+    # avanza bloque a bloque llevando el estado escalar de uno al siguiente
+    block = steps if collector is None else collector.block_hours
+    state = (
+        float(energy_system.energy_price), float(energy_system.renewable_adoption),
+        float(energy_system.storage_capacity), float(energy_system.learning_rate),
+        float(energy_system.storage_growth_rate), float(max_demand)
+    )
+    for block_start in range(0, steps, block):
+        block_end = min(steps, block_start + block)
+        base_arrays = []
+        for i in range(block_start, block_end):
+            h = start + i
+            home_base = base_source(h, 'home', params.num_homes)
+            commercial_base = base_source(h, 'business', params.num_commercial)
+            industrial_base = base_source(h, 'industry', params.num_industrial)
+            home_sums[i] = home_base.sum()
+            commercial_sums[i] = commercial_base.sum()
+            industrial_sums[i] = industrial_base.sum()
+            if collector is not None:
+                base_arrays.append((home_base, commercial_base, industrial_base))
+        
+        window = slice(block_start, block_end)
+        # El estado pasa de un bloque al siguiente tal cual lo devuelve el kernel
+        # (mismo resultado que en una sola llamada)
+        max_demand, *system_state = kernel(
+            kernels.STRATEGY_CODES.get(strategy, 0), state_indices[window], multipliers[window],
+            home_sums[window], commercial_sums[window], industrial_sums[window],
+            float(base_price), *state, *(output[window] for output in outputs)
+        )
+        state = (*system_state, max_demand)
+        
+        for i, (home_base, commercial_base, industrial_base) in enumerate(base_arrays, start=block_start):
+            collector.add(home_base * outputs[6, i], commercial_base * outputs[7, i], industrial_base * outputs[8, i])
+    
+    (energy_system.energy_price, energy_system.renewable_adoption, energy_system.storage_capacity,
+     energy_system.learning_rate, energy_system.storage_growth_rate) = system_state
+    demand_profile.extend(outputs[0].tolist())
+    price_profile.extend(outputs[1].tolist())
+    emission_factors.extend(outputs[2].tolist())
+    energy_system.price_history.extend(outputs[3].tolist())
+    energy_system.renewable_history.extend(outputs[4].tolist())
+    energy_system.storage_history.extend(outputs[5].tolist())
+    return max_demand
+
+def _request_cache(params):
+    """
+    Caché del proceso solo con semilla explícita: las semillas derivadas del
+    reloj (Monte Carlo sin semilla) no se repiten, y sus artefactos solo
+    desalojarían los reutilizables.
+    """
+    if getattr(params, 'seed', None) is not None:
+        return simulation_cache
+    return SimulationCache(max_entries=0)
+
+@_holding_rng_lock
+def simulate_demand_single_run(params, strategy, energy_system=None, seed=None, hour_start=0, day_type='weekday',
+                               cache=None, snapshot=None, collector=None, base_source=None):
+    """
+    Ejecuta una simulación de demanda eléctrica
+    
+    Args:
+        params: Parámetros de simulación
+        strategy: Estrategia de gestión ('fixed', 'demand_response', 'smart_grid')
+        energy_system: Sistema energético para dinámica de sistemas (opcional)
+        seed: Semilla para reproducibilidad (None para aleatorio)
+        hour_start: Hora de inicio de la simulación (0-23)
+        day_type: 'weekday' o 'weekend'
+        cache: Caché de artefactos sembrados (por defecto la caché del proceso)
+        snapshot: Snapshot de una simulación previa desde el que continuar (opcional)
+        collector: TopologyLoadCollector para agregar la carga por nodo de la red (opcional)
+        base_source: Fuente alternativa de consumo base, p. ej. un perfil medido
+            (LoadProfileStore.base_source); por defecto el consumo sintético
+        
+    Returns:
+        Resultados de la simulación
+    """    
+    # Establecer semilla si se proporciona (al continuar, derivada del punto de
+    # partida); al continuar sin semilla se retoma el estado del generador guardado
+    # en el snapshot
+    requested_seed = seed
+    if seed is not None and snapshot is not None:
+        seed = continuation_seed(seed, snapshot)
+    if seed is not None:
+        np.random.seed(seed)
+    elif snapshot is not None and snapshot.get("rng_state"):
+        np.random.set_state(decode_rng_state(snapshot["rng_state"]))
+    
+    if cache is None:
+        cache = simulation_cache
+    
+    hours = params.hours
+    
+    # Inicializar sistema energético si no se proporciona
+    if energy_system is None:
+        energy_system = EnergySystem() if snapshot is None else EnergySystem.from_snapshot(snapshot["energy_system"])
+    
+    # Precio base inicial
+    base_price = energy_system.energy_price
+    
+    # Con semilla explícita la ejecución es determinista: se puede reutilizar un
+    # checkpoint de la misma estrategia y continuar solo las horas añadidas
+    run_key = None
+    checkpoint = None
+    # (los checkpoints no guardan la carga por consumidor: sin caché si se agrega por
+    # topología; con una fuente de consumo externa la clave no identifica la ejecución)
+    if seed is not None and snapshot is None and collector is None and base_source is None and cache.enabled:
+        run_key = (
+            seed, strategy, params.num_homes, params.num_commercial, params.num_industrial,
+            hour_start, day_type, energy_system.signature(), kernels.get_backend(),
+            getattr(params, 'precision', 'float64')
+        )
+        checkpoint = cache.get_run(run_key)
+    
+    # Generar estados de Markov (reutilizando la secuencia sembrada si existe)
+    if run_key is not None:
+        markov_states, state_multipliers = _cached_markov_states(cache, seed, hours, hour_start, day_type)
+    else:
+        initial_state = snapshot["markov_state"] if snapshot is not None else None
+        markov_states, state_multipliers = generate_markov_states(hours, hour_start, day_type, initial_state)
+    
+    if base_source is not None:
+        source = base_source
+    else:
+        source = _synthetic_base_source(cache, day_type, seed, simulation_dtype(params))
+    
+    if checkpoint is not None and checkpoint.hours >= hours:
+        demand_profile, price_profile, emission_factors, max_demand = checkpoint.restore(energy_system, hours)
+    else:
+        if checkpoint is not None:
+            demand_profile, price_profile, emission_factors, max_demand = checkpoint.restore(energy_system)
+            start = checkpoint.hours
+        else:
+            demand_profile, price_profile, emission_factors = [], [], []
+            # Para calcular el máximo durante la simulación (continúa el del snapshot)
+            max_demand = snapshot["max_demand"] if snapshot is not None else 0
+            start = 0
+        
+        max_demand = _simulate_hours(
+            params, strategy, energy_system, markov_states, state_multipliers, base_price,
+            start, hours, source, max_demand, demand_profile, price_profile, emission_factors,
+            collector
+        )
+        
+        if run_key is not None:
+            cache.put_run(run_key, RunCheckpoint(
+                hours, list(demand_profile), list(price_profile), list(emission_factors), max_demand, energy_system
+            ))
+    
+    if base_source is None and seed is not None and cache.enabled:
+        # Con caché (checkpoints o consumos base) se omiten sorteos: dejar el generador
+        # como lo deja la última hora simulada sin caché (el consumo industrial resiembra y sortea)
+        generate_base_consumption(params.num_industrial, 'industry', (hours - 1) % 24, day_type, seed)
+    
+    # Snapshot compacto para continuar la simulación desde el final de esta ejecución
+    final_snapshot = {
+        "energy_system": energy_system.to_snapshot(),
+        "max_demand": float(max_demand),
+        "markov_state": markov_states[-1],
+        "hour": (hour_start + hours) % 24,
+        "elapsed_hours": (snapshot["elapsed_hours"] if snapshot is not None else 0) + hours,
+        "rng_state": encode_rng_state(np.random.get_state())
+    }
     
     # Calcular métricas
     peak_demand = max(demand_profile)
     avg_demand = np.mean(demand_profile)
     
-    # Calcular emisiones y ahorro
+    # Calcular emisiones y ahorro (los perfiles son floats de Python: acumulación en float64)
     total_emissions = sum(demand_profile[i] * emission_factors[i] for i in range(hours))
     
     # Para respuesta a la demanda y smart grid, crear una simulación de referencia
     if strategy in ['demand_response', 'smart_grid']:
         # Crear sistema de referencia para comparar ahorro
-        ref_system = EnergySystem(energy_system.price_history[0])
-        # Usar la misma semilla para comparación consistente
-        ref_seed = seed if seed is not None else None
+        if snapshot is not None:
+            ref_system = EnergySystem.from_snapshot(snapshot["energy_system"])
+        else:
+            ref_system = EnergySystem(energy_system.price_history[0])
+        # Usar la misma semilla (o el mismo snapshot) para comparación consistente;
+        # la continuación deriva la misma semilla que esta ejecución
+        ref_seed = requested_seed
         ref_result = simulate_demand_single_run(
             params, 'fixed', ref_system, 
-            ref_seed, hour_start, day_type
+            ref_seed, hour_start, day_type,
+            cache=cache, snapshot=snapshot, base_source=base_source
         )
         ref_peak = ref_result['peak_demand']
         ref_emissions = ref_result['total_emissions']
@@ -503,10 +921,293 @@ def simulate_demand_single_run(params, strategy, energy_system=None, seed=None,
             "price": energy_system.price_history,
             "renewable": energy_system.renewable_history,
             "storage": energy_system.storage_history
+        },
+        "snapshot": final_snapshot
+    }
+
+class MonteCarloPartial:
+    """
+    Estadísticas parciales de un bloque de muestras Monte Carlo, combinables
+    entre bloques (p. ej. calculados por workers distintos) con merge():
+    media y suma de cuadrados de desviaciones (M2) por hora de la serie de
+    demanda, media de la serie de precios y los arreglos de picos, demandas
+    medias y emisiones reducidas por muestra.
+    """
+    def __init__(self, hours: int):
+        self.count = 0
+        self.time_series_mean = np.zeros(hours)
+        self.time_series_m2 = np.zeros(hours)
+        self.price_count = 0
+        self.price_series_mean = np.zeros(hours)
+        self.peak_demands = np.zeros(0)
+        self.average_demands = np.zeros(0)
+        self.reduced_emissions = np.zeros(0)
+        # Estado final de la última muestra del bloque
+        self.last_sample = -1
+        self.snapshot = None
+        self.energy_system_state = None
+
+    @classmethod
+    def from_samples(cls, time_series, price_series, peak_demands, average_demands, reduced_emissions,
+                     first_sample: int = 0, last_result=None):
+        """
+        Args:
+            time_series, price_series: Tensores (muestras válidas x horas), en la
+                precisión de la simulación; medias y M2 se acumulan en float64
+            peak_demands, average_demands, reduced_emissions: Métricas por muestra
+            first_sample: Índice de la primera muestra del bloque
+            last_result: Resultado de la última muestra (estado final)
+        """
+        partial = cls(time_series.shape[1])
+        if len(time_series):
+            partial.count = len(time_series)
+            partial.time_series_mean = np.mean(time_series, axis=0, dtype=np.float64)
+            partial.time_series_m2 = np.sum(np.square(time_series - partial.time_series_mean), axis=0)
+        if len(price_series):
+            partial.price_count = len(price_series)
+            partial.price_series_mean = np.mean(price_series, axis=0, dtype=np.float64)
+
+        partial.peak_demands = np.asarray(peak_demands, dtype=np.float64)
+        partial.average_demands = np.asarray(average_demands, dtype=np.float64)
+        partial.reduced_emissions = np.asarray(reduced_emissions, dtype=np.float64)
+        if last_result is not None:
+            partial.last_sample = first_sample + len(partial.peak_demands) - 1
+            partial.snapshot = last_result["snapshot"]
+            partial.energy_system_state = last_result.get("energy_system_state")
+        return partial
+
+    def merge(self, other: "MonteCarloPartial"):
+        """Combina otro bloque (fórmulas de Chan et al. para media y varianza)"""
+        if other.count:
+            if self.count == 0:
+                self.time_series_mean = other.time_series_mean.copy()
+                self.time_series_m2 = other.time_series_m2.copy()
+            else:
+                count = self.count + other.count
+                delta = other.time_series_mean - self.time_series_mean
+                self.time_series_mean = self.time_series_mean + delta * (other.count / count)
+                self.time_series_m2 = (self.time_series_m2 + other.time_series_m2 +
+                                       np.square(delta) * (self.count * other.count / count))
+            self.count += other.count
+        if other.price_count:
+            price_count = self.price_count + other.price_count
+            self.price_series_mean = (self.price_series_mean * (self.price_count / price_count) +
+                                      other.price_series_mean * (other.price_count / price_count))
+            self.price_count = price_count
+
+        self.peak_demands = np.concatenate((self.peak_demands, other.peak_demands))
+        self.average_demands = np.concatenate((self.average_demands, other.average_demands))
+        self.reduced_emissions = np.concatenate((self.reduced_emissions, other.reduced_emissions))
+        if other.last_sample > self.last_sample:
+            self.last_sample = other.last_sample
+            self.snapshot = other.snapshot
+            self.energy_system_state = other.energy_system_state
+        return self
+
+    @property
+    def time_series_std(self) -> np.ndarray:
+        return np.sqrt(self.time_series_m2 / self.count)
+
+    def to_dict(self) -> dict:
+        """Representación JSON para la cola de trabajo"""
+        return {
+            "count": self.count,
+            "time_series_mean": self.time_series_mean.tolist(),
+            "time_series_m2": self.time_series_m2.tolist(),
+            "price_count": self.price_count,
+            "price_series_mean": self.price_series_mean.tolist(),
+            "peak_demands": self.peak_demands.tolist(),
+            "average_demands": self.average_demands.tolist(),
+            "reduced_emissions": self.reduced_emissions.tolist(),
+            "last_sample": self.last_sample,
+            "snapshot": self.snapshot,
+            "energy_system_state": self.energy_system_state
         }
+
+    @classmethod
+    def from_dict(cls, data: dict):
+        partial = cls(len(data["time_series_mean"]))
+        for name in ("count", "price_count", "last_sample", "snapshot", "energy_system_state"):
+            setattr(partial, name, data[name])
+        for name in ("time_series_mean", "time_series_m2", "price_series_mean",
+                     "peak_demands", "average_demands", "reduced_emissions"):
+            setattr(partial, name, np.asarray(data[name], dtype=np.float64))
+        return partial
+
+def _resolve_base_source(params, snapshot, hour_start):
+    """Fuente de consumo base medida (params.load_profile) y la hora de inicio correspondiente"""
+    if not getattr(params, 'load_profile', None):
+        return None, hour_start
+    # Importación diferida: solo las simulaciones con perfil medido necesitan profiles
+    from profiles import open_profile
+    profile = open_profile(params.load_profile)
+    skip_hours = snapshot["elapsed_hours"] if snapshot is not None else 0
+    base_source = profile.base_source(params.profile_start, skip_hours, simulation_dtype(params))
+    if snapshot is None:
+        hour_start = profile.hour_of_day(params.profile_start)
+    return base_source, hour_start
+
+def _build_collector(params):
+    """Colector de carga por alimentador/subestación si params.topology está definido"""
+    topology_params = getattr(params, 'topology', None)
+    if topology_params is None:
+        return None
+    # Sin semilla propia, la asignación aleatoria usa la de la simulación:
+    # dos peticiones sembradas iguales describen la misma red
+    topology_seed = topology_params.seed if topology_params.seed is not None else getattr(params, 'seed', None)
+    topology = build_topology(
+        params.num_homes, params.num_commercial, params.num_industrial,
+        topology_params.feeders, topology_params.substations,
+        topology_params.capacity_factor, topology_seed,
+        topology_params.consumer_feeders, topology_params.feeder_substations,
+        topology_params.feeder_capacities, topology_params.substation_capacities
+    )
+    return TopologyLoadCollector(topology, params.hours, simulation_dtype(params))
+
+def run_monte_carlo_chunk(params, strategy, base_seed: int, start: int, stop: int, hour_start: int,
+                          snapshot=None, collector=None, base_source=None) -> MonteCarloPartial:
+    """
+    Simula las muestras Monte Carlo [start, stop) y devuelve sus estadísticas
+    parciales. La muestra i usa la semilla base_seed + i, de modo que el
+    resultado no depende de cómo se repartan las muestras en bloques.
+    """
+    # Tensores (muestras x horas) preasignados en la precisión de la simulación
+    samples = max(0, stop - start)
+    dtype = simulation_dtype(params)
+    time_series = np.empty((samples, params.hours), dtype=dtype)
+    price_series = np.empty((samples, params.hours), dtype=dtype)
+    valid_time_series = np.zeros(samples, dtype=bool)
+    valid_price_series = np.zeros(samples, dtype=bool)
+    metrics = np.empty((3, samples))  # pico, demanda media y emisiones reducidas
+    result = None
+    cache = _request_cache(params)
+    for j, i in enumerate(range(start, stop)):
+        energy_system = EnergySystem() if snapshot is None else EnergySystem.from_snapshot(snapshot["energy_system"])
+        # Semillas incrementales para reproducibilidad
+        simulation_seed = base_seed + i
+        
+        # Variación controlada de parámetros
+        day_type = params.day_type
+        
+        # Para algunas muestras, variar el tipo de día (30% weekend)
+        if i % 10 >= 7:  # 30% de las muestras
+            day_type = "weekend" if day_type == "weekday" else "weekday"
+        
+        result = simulate_demand_single_run(
+            params, strategy, energy_system, 
+            simulation_seed, hour_start, day_type,
+            cache=cache, snapshot=snapshot, collector=collector, base_source=base_source
+        )
+        if collector is not None:
+            collector.end_sample()
+        
+        # Solo las series con la longitud esperada
+        if len(result["time_series"]) == params.hours:
+            time_series[j] = result["time_series"]
+            valid_time_series[j] = True
+        if len(result["price_series"]) == params.hours:
+            price_series[j] = result["price_series"]
+            valid_price_series[j] = True
+        metrics[:, j] = (result["peak_demand"], result["average_demand"], result["reduced_emissions"])
+    
+    return MonteCarloPartial.from_samples(
+        time_series[valid_time_series], price_series[valid_price_series],
+        metrics[0], metrics[1], metrics[2], start, result
+    )
+
+def run_monte_carlo_task(payload: dict) -> dict:
+    """
+    Ejecuta una tarea publicada por _run_distributed() (en un worker).
+
+    Returns:
+        {"partial": MonteCarloPartial.to_dict(), "topology": estadísticas del colector o None}
+    """
+    params = SimulationParams(**payload["params"])
+    snapshot = payload.get("snapshot")
+    base_source, _ = _resolve_base_source(params, snapshot, payload["hour_start"])
+    collector = _build_collector(params)
+    partial = run_monte_carlo_chunk(
+        params, payload["strategy"], payload["base_seed"], payload["start"], payload["stop"],
+        payload["hour_start"], snapshot=snapshot, collector=collector, base_source=base_source
+    )
+    return {
+        "partial": partial.to_dict(),
+        "topology": collector.stats() if collector is not None else None
     }
 
-def simulate_demand(params, strategy, system=None):
+def process_task(queue: "WorkQueue", task: "Task"):
+    """Ejecuta una tarea reclamada y publica su resultado (o el error) en la cola"""
+    try:
+        result = run_monte_carlo_task(task.payload)
+    except Exception as e:
+        queue.fail(task, f"{type(e).__name__}: {e}")
+    else:
+        queue.complete(task, result)
+
+def _run_distributed(params, strategy, base_seed, hour_start, snapshot, collector, queue=None) -> MonteCarloPartial:
+    """
+    Reparte las muestras Monte Carlo en bloques de params.distributed.chunk_size,
+    los publica en la cola de trabajo y combina las estadísticas parciales de
+    los workers. Si distributed.local_worker está activo, este proceso también
+    ejecuta tareas del trabajo mientras espera.
+    """
+    options = params.distributed
+    if queue is None:
+        # Importación diferida: solo el Monte Carlo distribuido necesita la cola
+        from work_queue import get_work_queue
+        queue = get_work_queue()
+    job_id = uuid.uuid4().hex
+    worker_id = f"coordinator-{job_id}"
+    
+    payload_params = params.model_dump(mode="json", exclude={"distributed", "snapshot"})
+    payloads = {}
+    for start in range(0, params.montecarlo_samples, options.chunk_size):
+        payloads[f"{start:08d}"] = {
+            "params": payload_params,
+            "strategy": strategy,
+            "base_seed": base_seed,
+            "start": start,
+            "stop": min(start + options.chunk_size, params.montecarlo_samples),
+            "hour_start": hour_start,
+            "snapshot": snapshot
+        }
+    
+    queue.submit(job_id, payloads)
+    try:
+        deadline = time.monotonic() + options.timeout
+        while True:
+            errors = queue.errors(job_id)
+            if errors:
+                task_id, error = sorted(errors.items())[0]
+                raise RuntimeError(f"Monte Carlo task {task_id} failed: {error}")
+            # Solo se cuentan las tareas completadas; los resultados se leen una vez al final
+            completed = queue.count_done(job_id)
+            if completed == len(payloads):
+                results = queue.results(job_id)
+                break
+            
+            task = queue.claim(worker_id, job_id) if options.local_worker else None
+            if task is not None:
+                process_task(queue, task)
+                continue
+            if time.monotonic() > deadline:
+                raise TimeoutError(
+                    f"Distributed Monte Carlo timed out after {options.timeout} s "
+                    f"({completed}/{len(payloads)} chunks completed)"
+                )
+            time.sleep(options.poll_interval)
+    finally:
+        queue.purge(job_id)
+    
+    # Combinar en el orden de las muestras
+    partial = MonteCarloPartial(params.hours)
+    for task_id in sorted(results):
+        partial.merge(MonteCarloPartial.from_dict(results[task_id]["partial"]))
+        if collector is not None:
+            collector.merge_stats(results[task_id]["topology"])
+    return partial
+
+def simulate_demand(params, strategy, system=None, snapshot=None, queue=None):
     """
     Ejecuta una simulación completa con los paradigmas seleccionados.
     
@@ -525,20 +1226,48 @@ def simulate_demand(params, strategy, system=None):
     
     4. Simulación de Eventos Discretos: El sistema avanza en pasos de tiempo discretos
        (horas), actualizando el estado del sistema en cada paso.
+    
+    Si se indica un snapshot (argumento o params.snapshot), la simulación continúa
+    desde ese estado (sistema energético, estado de Markov, demanda máxima y
+    generador aleatorio) a partir de la hora del día guardada, en lugar de
+    empezar desde los valores por defecto.
+    
+    Con params.distributed, las muestras Monte Carlo se reparten en bloques a
+    través de una cola de trabajo (`queue` o SIMULATION_QUEUE) y se combinan
+    las estadísticas parciales de los workers (ver worker.py).
     """
+    if snapshot is None and getattr(params, 'snapshot', None) is not None:
+        snapshot = params.snapshot.model_dump()
+    hour_start = snapshot["hour"] if snapshot is not None else params.hour_start
+    
+    distributed = getattr(params, 'distributed', None) is not None and params.montecarlo_samples > 1
+    topology_params = getattr(params, 'topology', None)
+    if distributed and topology_params is not None and topology_params.seed is None and params.seed is None:
+        # Todos los workers deben construir la misma topología (con semilla, la de la simulación)
+        topology_params = topology_params.model_copy(update={"seed": uuid.uuid4().int % 2**31})
+        params = params.model_copy(update={"topology": topology_params})
+    
+    # Consumo base medido en lugar del sintético (la hora de inicio es la del perfil)
+    base_source, hour_start = _resolve_base_source(params, snapshot, hour_start)
+    
     # Generar datos de red para visualización (siempre, independientemente de la estrategia)
     network_data = generate_network_data(params)
     
+    # Agregación por alimentador/subestación (opcional)
+    collector = _build_collector(params)
+    
     # Variables para almacenar la simulación de referencia
     fixed_demand = None
     
     # Si la estrategia NO es "fixed", ejecutar simulación de referencia
     if strategy != "fixed":
         # Crear sistema energético independiente para referencia
-        fixed_system = EnergySystem()
+        fixed_system = EnergySystem() if snapshot is None else EnergySystem.from_snapshot(snapshot["energy_system"])
         
-        # Usar misma semilla y parámetros para comparación justa
-        seed_to_use = 42  # Semilla por defecto
+        # Usar misma semilla y parámetros para comparación justa (al continuar,
+        # la semilla se deriva del snapshot con continuation_seed(); sin semilla,
+        # el generador del snapshot)
+        seed_to_use = 42 if snapshot is None else None  # Semilla por defecto
         if hasattr(params, 'seed') and params.seed is not None:
             seed_to_use = params.seed
             
@@ -547,8 +1276,10 @@ def simulate_demand(params, strategy, system=None):
             "fixed",
             fixed_system, 
             seed=seed_to_use,
-            hour_start=params.hour_start,
-            day_type=params.day_type
+            hour_start=hour_start,
+            day_type=params.day_type,
+            snapshot=snapshot,
+            base_source=base_source
         )
         
         # Solo incluir campos definidos en el modelo Pydantic
@@ -561,56 +1292,41 @@ def simulate_demand(params, strategy, system=None):
     # Monte Carlo o simulación única
     if params.montecarlo_samples > 1:
         # Ejecutar múltiples simulaciones
-        results = []
         # Manejar correctamente la semilla
         if hasattr(params, 'seed') and params.seed is not None:
             base_seed = params.seed
+        elif snapshot is not None and snapshot.get("rng_state"):
+            # Continuación reproducible: derivar la semilla del generador guardado
+            with _rng_lock:
+                np.random.set_state(decode_rng_state(snapshot["rng_state"]))
+                base_seed = int(np.random.randint(0, 2**31 - 1))
         else:
             base_seed = int(time.time())
         
-        for i in range(params.montecarlo_samples):
-            energy_system = EnergySystem()
-            # Semillas incrementales para reproducibilidad
-            simulation_seed = base_seed + i
-            
-            # Variación controlada de parámetros
-            hour_start = params.hour_start
-            day_type = params.day_type
-            
-            # Para algunas muestras, variar el tipo de día (30% weekend)
-            if i % 10 >= 7:  # 30% de las muestras
-                day_type = "weekend" if day_type == "weekday" else "weekday"
-            
-            result = simulate_demand_single_run(
-                params, strategy, energy_system, 
-                simulation_seed, hour_start, day_type
+        if distributed:
+            partial = _run_distributed(params, strategy, base_seed, hour_start, snapshot, collector, queue)
+        else:
+            partial = run_monte_carlo_chunk(
+                params, strategy, base_seed, 0, params.montecarlo_samples, hour_start,
+                snapshot=snapshot, collector=collector, base_source=base_source
             )
-            results.append(result)
-        
-        # Calcular estadísticas robustas
-        time_series_data = [r["time_series"] for r in results]
-        price_series_data = [r["price_series"] for r in results]
-        
-        # Validar que todas las series tengan la misma longitud
-        expected_length = params.hours
-        valid_time_series = [ts for ts in time_series_data if len(ts) == expected_length]
-        valid_price_series = [ps for ps in price_series_data if len(ps) == expected_length]
         
-        if not valid_time_series:
+        # Validar que se hayan generado series con la longitud esperada
+        if partial.count == 0:
             raise ValueError("No se generaron series de tiempo válidas en Monte Carlo")
         
-        time_series_mean = np.mean(valid_time_series, axis=0).tolist()
-        time_series_std = np.std(valid_time_series, axis=0).tolist()
-        price_series_mean = np.mean(valid_price_series, axis=0).tolist()
+        time_series_mean = partial.time_series_mean.tolist()
+        time_series_std = partial.time_series_std.tolist()
+        price_series_mean = partial.price_series_mean.tolist()
         
         # Métricas agregadas
-        peak_demands = [r["peak_demand"] for r in results]
-        avg_demands = [r["average_demand"] for r in results]
-        emission_reductions = [r["reduced_emissions"] for r in results]
+        peak_demands = partial.peak_demands
+        avg_demands = partial.average_demands
+        emission_reductions = partial.reduced_emissions
         
         # Intervalos de confianza (95%)
         confidence_level = 1.96
-        sample_size = len(results)
+        sample_size = len(peak_demands)
         
         peak_std = np.std(peak_demands)
         peak_error = confidence_level * peak_std / np.sqrt(sample_size)
@@ -621,10 +1337,10 @@ def simulate_demand(params, strategy, system=None):
         emission_std = np.std(emission_reductions)
         emission_error = confidence_level * emission_std / np.sqrt(sample_size)
         
-        # Calcular ahorro de costos
+        # Calcular ahorro de costos (precio medio de la serie completa, antes de cualquier reducción)
+        avg_price = np.mean(price_series_mean)
         cost_savings = 0
         if fixed_demand and strategy != "fixed":
-            avg_price = np.mean(price_series_mean)
             avg_fixed_demand = np.mean(fixed_demand["time_series"])
             avg_dr_demand = np.mean(time_series_mean)
             cost_savings = (avg_fixed_demand - avg_dr_demand) * params.hours * avg_price
@@ -634,6 +1350,7 @@ def simulate_demand(params, strategy, system=None):
             "time_series": time_series_mean,
             "time_series_std": time_series_std,
             "price_series": price_series_mean,
+            "average_price": float(avg_price),
             "peak_demand": float(np.mean(peak_demands)),
             "peak_demand_std": float(peak_std),
             "peak_demand_confidence": float(peak_error),
@@ -651,17 +1368,25 @@ def simulate_demand(params, strategy, system=None):
             "hours": params.hours
         }
         
-        # Estado final del sistema energético
-        if results:
-            last_result = results[-1]
-            if "energy_system_state" in last_result:
-                result["final_energy_system"] = last_result["energy_system_state"]
+        # Estado final del sistema energético (última muestra)
+        if partial.last_sample >= 0:
+            if partial.energy_system_state is not None:
+                result["final_energy_system"] = partial.energy_system_state
+            result["snapshot"] = partial.snapshot
+        
+        if collector is not None:
+            result["topology"] = collector.summary()
         
         return result
     
     else:
         # Simulación única
-        energy_system = EnergySystem() if system is None else system
+        if system is not None:
+            energy_system = system
+        elif snapshot is not None:
+            energy_system = EnergySystem.from_snapshot(snapshot["energy_system"])
+        else:
+            energy_system = EnergySystem()
         # Manejar correctamente la semilla para simulación única
         single_seed = None
         if hasattr(params, 'seed') and params.seed is not None:
@@ -670,14 +1395,20 @@ def simulate_demand(params, strategy, system=None):
         single_result = simulate_demand_single_run(
             params, strategy, energy_system,
             seed=single_seed,
-            hour_start=params.hour_start,
-            day_type=params.day_type
+            hour_start=hour_start,
+            day_type=params.day_type,
+            snapshot=snapshot,
+            collector=collector,
+            base_source=base_source
         )
         
-        # Calcular ahorro de costos
+        if collector is not None:
+            collector.end_sample()
+        
+        # Calcular ahorro de costos (precio medio de la serie completa, antes de cualquier reducción)
+        avg_price = np.mean(single_result["price_series"])
         cost_savings = 0
         if fixed_demand and strategy != "fixed":
-            avg_price = np.mean(single_result["price_series"])
             avg_fixed_demand = np.mean(fixed_demand["time_series"])
             avg_dr_demand = np.mean(single_result["time_series"])
             cost_savings = (avg_fixed_demand - avg_dr_demand) * params.hours * avg_price
@@ -686,6 +1417,7 @@ def simulate_demand(params, strategy, system=None):
         result = {
             "time_series": single_result["time_series"],
             "price_series": single_result["price_series"],
+            "average_price": float(avg_price),
             "peak_demand": float(single_result["peak_demand"]),
             "average_demand": float(single_result["average_demand"]),
             "reduced_emissions": float(single_result["reduced_emissions"]),
@@ -700,6 +1432,10 @@ def simulate_demand(params, strategy, system=None):
         # Estado final del sistema energético
         if "energy_system_state" in single_result:
             result["final_energy_system"] = single_result["energy_system_state"]
+        result["snapshot"] = single_result["snapshot"]
+        
+        if collector is not None:
+            result["topology"] = collector.summary()
         
         return result
 
@@ -711,6 +1447,7 @@ def normalize_transition_matrix(matrix):
     row_sums[row_sums == 0] = 1
     return matrix / row_sums[:, np.newaxis]
 
+@_holding_rng_lock
 def generate_network_data(params):
     """
     Genera datos de red para la visualización
@@ -0,0 +1,158 @@
+from collections import OrderedDict
+import copy
+import os
+import threading
+
+class RunCheckpoint:
+    """Estado de una ejecución sembrada tras simular `hours` horas"""
+    def __init__(self, hours, demand_profile, price_profile, emission_factors, max_demand, energy_system):
+        self.hours = hours
+        self.demand_profile = demand_profile
+        self.price_profile = price_profile
+        self.emission_factors = emission_factors
+        self.max_demand = max_demand
+        # Copia independiente: el sistema del llamador sigue mutando después
+        self.energy_system = copy.deepcopy(energy_system)
+
+    def restore(self, energy_system, hours=None):
+        """
+        Copia el estado del checkpoint en `energy_system`.
+
+        Si `hours` es menor que las horas del checkpoint, se restaura el estado
+        que tenía el sistema en esa hora (las historias guardan cada paso).
+
+        Returns:
+            Tupla (demand_profile, price_profile, emission_factors, max_demand)
+        """
+        hours = self.hours if hours is None else hours
+        state = copy.deepcopy(self.energy_system.__dict__)
+        if hours < self.hours:
+            # Las historias incluyen el estado inicial, más una entrada por hora
+            keep = len(state["price_history"]) - (self.hours - hours)
+            for name in ("price_history", "renewable_history", "storage_history"):
+                state[name] = state[name][:keep]
+            state["energy_price"] = state["price_history"][-1]
+            state["renewable_adoption"] = state["renewable_history"][-1]
+            state["storage_capacity"] = state["storage_history"][-1]
+        energy_system.__dict__.update(state)
+
+        demand_profile = self.demand_profile[:hours]
+        max_demand = max(demand_profile) if hours < self.hours else self.max_demand
+        return (
+            list(demand_profile),
+            list(self.price_profile[:hours]),
+            list(self.emission_factors[:hours]),
+            max_demand
+        )
+
+class SimulationCache:
+    """
+    Caché LRU de artefactos reutilizables entre peticiones sembradas.
+
+    Guarda tres tipos de entradas:
+    - Secuencias de Markov (con el estado del generador para poder extenderlas)
+    - Consumos base por tipo de entidad y hora del día
+    - Checkpoints de ejecuciones completas por estrategia, para continuar
+      cuando solo se amplía el horizonte
+
+    Solo se usa con semillas explícitas; sin semilla los resultados no son
+    reproducibles y no hay nada que reutilizar.
+
+    Los consumos base crecen con el número de entidades, por lo que además del
+    número de entradas se limitan por memoria (`max_base_bytes`).
+
+    Es compartida por los hilos del servidor: cada operación toma un lock.
+    """
+    def __init__(self, max_entries: int = 64, max_base_bytes: int = 256 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_base_bytes = max_base_bytes
+        self._markov = OrderedDict()
+        self._base = OrderedDict()
+        self._base_bytes = 0
+        self._runs = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+    def _get(self, store, key):
+        with self._lock:
+            value = store.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            store.move_to_end(key)
+            return value
+
+    def _put(self, store, key, value, max_entries):
+        with self._lock:
+            store[key] = value
+            store.move_to_end(key)
+            while len(store) > max_entries:
+                store.popitem(last=False)
+
+    def get_markov(self, key):
+        return self._get(self._markov, key)
+
+    def put_markov(self, key, state_indices, rng_state):
+        self._put(self._markov, key, (state_indices, rng_state), self.max_entries)
+
+    def get_base(self, key):
+        return self._get(self._base, key)
+
+    def put_base(self, key, consumption):
+        # Arreglos mayores que todo el presupuesto no se guardan
+        if consumption.nbytes > self.max_base_bytes:
+            return
+        consumption.setflags(write=False)
+        with self._lock:
+            if key in self._base:
+                self._base_bytes -= self._base.pop(key).nbytes
+            self._base[key] = consumption
+            self._base_bytes += consumption.nbytes
+            # Hasta 24 horas x 3 tipos de entidad por semilla, dentro del límite de memoria
+            while len(self._base) > self.max_entries * 72 or self._base_bytes > self.max_base_bytes:
+                _, evicted = self._base.popitem(last=False)
+                self._base_bytes -= evicted.nbytes
+
+    def get_run(self, key):
+        return self._get(self._runs, key)
+
+    def put_run(self, key, checkpoint: RunCheckpoint):
+        self._put(self._runs, key, checkpoint, self.max_entries)
+
+    def clear_runs(self):
+        """Descarta los checkpoints de ejecuciones, conservando los artefactos sembrados"""
+        with self._lock:
+            self._runs.clear()
+
+    def clear(self):
+        with self._lock:
+            self._markov.clear()
+            self._base.clear()
+            self._base_bytes = 0
+            self._runs.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "markov_entries": len(self._markov),
+                "base_entries": len(self._base),
+                "base_bytes": self._base_bytes,
+                "run_entries": len(self._runs),
+                "hits": self.hits,
+                "misses": self.misses
+            }
+
+# Caché compartida por el proceso (SIMULATION_CACHE_SIZE=0 la desactiva)
+# (SIMULATION_CACHE_BASE_MB limita la memoria de los consumos base)
+simulation_cache = SimulationCache(
+    int(os.getenv("SIMULATION_CACHE_SIZE", "64")),
+    int(os.getenv("SIMULATION_CACHE_BASE_MB", "256")) * 1024 * 1024
+)
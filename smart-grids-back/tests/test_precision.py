@@ -0,0 +1,29 @@
+"""Desviación del modo float32 frente a float64 (precision.py)"""
+import pytest
+
+from models import SimulationParams
+from precision import PRECISION_METRICS, validate_precision
+from simulation import simulate_demand
+
+RTOL = 1e-5
+
+@pytest.fixture
+def params():
+    return SimulationParams(
+        homes=60, businesses=15, industries=5, simulation_hours=72,
+        monte_carlo_samples=3, seed=1234
+    )
+
+@pytest.mark.parametrize("strategy", ["fixed", "demand_response", "smart_grid"])
+def test_float32_metrics_within_tolerance(params, strategy):
+    expected = simulate_demand(params, strategy)
+    actual = simulate_demand(params.model_copy(update={"precision": "float32"}), strategy)
+    for key in PRECISION_METRICS:
+        assert actual[key] == pytest.approx(expected[key], rel=RTOL, abs=1e-9), key
+
+def test_validate_precision_bound(params):
+    assert 0 <= validate_precision(params, RTOL) <= RTOL
+
+def test_validate_precision_raises_above_tolerance(params):
+    with pytest.raises(ValueError, match="float32 mode deviates"):
+        validate_precision(params, rtol=1e-12)
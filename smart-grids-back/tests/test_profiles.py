@@ -0,0 +1,81 @@
+"""Perfiles de carga medidos (profiles.py)"""
+import os
+import threading
+
+import numpy as np
+import pytest
+
+import profiles
+from profiles import LoadProfileError, convert_profile, load_profile, open_profile
+
+def write_readings(path, meters, hours=48):
+    with open(path, "w") as f:
+        f.write("meter_id,timestamp,kwh,type\n")
+        for h in range(hours):
+            timestamp = np.datetime64("2024-03-01T00:00") + np.timedelta64(h, "h")
+            for k, (meter_id, meter_type) in enumerate(meters):
+                # Dos lecturas de 30 minutos por hora
+                for minute in (0, 30):
+                    f.write(f"{meter_id},{timestamp + np.timedelta64(minute, 'm')},{0.5 * (k + 1)},{meter_type}\n")
+
+@pytest.fixture
+def profile_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(profiles, "PROFILE_DIR", str(tmp_path))
+    monkeypatch.setattr(profiles, "_open_stores", {})
+    return tmp_path
+
+def test_convert_aggregates_hourly(profile_dir):
+    path = str(profile_dir / "city.csv")
+    write_readings(path, [("007", "home"), ("B1", "business"), ("42", "industry")])
+    store = load_profile(path)
+    assert store.hours == 48
+    # Los IDs se conservan como texto ('007' no pasa a 7)
+    assert sorted(store.meter_ids) == ["007", "42", "B1"]
+    hourly = dict(zip(store.meter_ids, store.hourly[5]))
+    assert hourly == {"007": 1.0, "B1": 2.0, "42": 3.0}
+
+def test_offset_outside_profile(profile_dir):
+    path = str(profile_dir / "city.csv")
+    write_readings(path, [("h1", "home")])
+    store = load_profile(path)
+    assert store.offset("2024-03-02T05:00") == 29
+    for start in ("2024-02-29T23:00", "2024-03-03T00:00"):
+        with pytest.raises(LoadProfileError):
+            store.offset(start)
+
+def test_open_profile_requires_conversion(profile_dir):
+    path = str(profile_dir / "city.csv")
+    write_readings(path, [("h1", "home")])
+    with pytest.raises(LoadProfileError, match="profiles.py convert"):
+        open_profile("city")
+    convert_profile(path)
+    assert open_profile("city").hours == 48
+
+    # Archivo de origen modificado: hay que volver a convertir
+    write_readings(path, [("h1", "home")], hours=24)
+    os.utime(path, (1, 1))
+    with pytest.raises(LoadProfileError):
+        open_profile("city")
+
+def test_concurrent_conversions(profile_dir):
+    path = str(profile_dir / "city.csv")
+    write_readings(path, [("h1", "home"), ("b1", "business")])
+    errors = []
+
+    def convert():
+        try:
+            convert_profile(path, chunk_rows=50)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=convert) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+    store = load_profile(path, convert=False)
+    np.testing.assert_allclose(store.hourly[:, store.meter_ids.index("h1")], 1.0)
+    np.testing.assert_allclose(store.hourly[:, store.meter_ids.index("b1")], 2.0)
+    # Sin directorios temporales abandonados
+    assert sorted(os.listdir(profile_dir)) == ["city.csv", "city.csv.profile", "city.csv.profile.lock"]
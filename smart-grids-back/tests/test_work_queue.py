@@ -0,0 +1,93 @@
+"""Colas de trabajo del Monte Carlo distribuido (work_queue.py) y worker.py"""
+import time
+
+import pytest
+
+from work_queue import Task, get_work_queue
+from worker import run_worker
+
+@pytest.fixture(params=["sqlite", "file"])
+def make_queue(request, tmp_path):
+    def make(lease_seconds=600):
+        if request.param == "sqlite":
+            return get_work_queue(f"sqlite://{tmp_path / 'queue.db'}", lease_seconds=lease_seconds)
+        return get_work_queue(f"file://{tmp_path / 'queue'}", lease_seconds=lease_seconds)
+    return make
+
+def test_submit_claim_complete(make_queue):
+    queue = make_queue()
+    queue.submit("job", {"a": {"n": 1}, "b": {"n": 2}})
+
+    first = queue.claim("w1", "job")
+    second = queue.claim("w2")
+    assert {first.task_id, second.task_id} == {"a", "b"}
+    assert {first.payload["n"], second.payload["n"]} == {1, 2}
+    assert queue.claim("w3", "job") is None
+
+    queue.complete(first, {"value": first.payload["n"]})
+    assert queue.count_done("job") == 1
+    queue.complete(second, {"value": second.payload["n"]})
+    assert queue.count_done("job") == 2
+    assert queue.results("job") == {"a": {"value": 1}, "b": {"value": 2}}
+    assert queue.errors("job") == {}
+
+def test_claim_only_requested_job(make_queue):
+    queue = make_queue()
+    queue.submit("job1", {"a": {}})
+    queue.submit("job2", {"b": {}})
+    task = queue.claim("w1", "job2")
+    assert (task.job_id, task.task_id) == ("job2", "b")
+    assert queue.claim("w1", "job2") is None
+
+def test_fail_publishes_error(make_queue):
+    queue = make_queue()
+    queue.submit("job", {"a": {}})
+    queue.fail(queue.claim("w1", "job"), "ValueError: boom")
+    assert queue.errors("job") == {"a": "ValueError: boom"}
+    assert queue.count_done("job") == 0
+
+def test_expired_lease_is_reclaimed(make_queue):
+    queue = make_queue(lease_seconds=0.05)
+    queue.submit("job", {"a": {"n": 1}})
+    assert queue.claim("w1", "job") is not None
+    time.sleep(0.1)
+    task = queue.claim("w2", "job")
+    assert task is not None and task.task_id == "a"
+    queue.complete(task, {"value": 1})
+    assert queue.results("job") == {"a": {"value": 1}}
+
+def test_purge_while_running(make_queue):
+    queue = make_queue()
+    queue.submit("job", {"a": {}, "b": {}})
+    running = queue.claim("w1", "job")
+    queue.purge("job")
+
+    # El worker termina su tarea después de que el coordinador eliminara el trabajo
+    queue.complete(running, {"value": 1})
+    queue.fail(Task("job", "b", {}), "late error")
+    assert queue.claim("w1", "job") is None
+    assert queue.claim("w1") is None
+    assert queue.count_done("job") == 0
+    assert queue.results("job") == {}
+    assert queue.errors("job") == {}
+
+def test_purge_unknown_job(make_queue):
+    queue = make_queue()
+    queue.purge("missing")
+    assert queue.count_done("missing") == 0
+
+class FlakyQueue:
+    """Cola cuyo primer reclamo falla (p. ej. disco compartido no disponible)"""
+    def __init__(self):
+        self.calls = 0
+
+    def claim(self, worker_id, job_id=None):
+        self.calls += 1
+        if self.calls == 1:
+            raise OSError("queue unavailable")
+        return None
+
+def test_worker_keeps_polling_after_queue_error():
+    queue = FlakyQueue()
+    assert run_worker(queue, "w1", poll_interval=0, burst=True) == 0
+    assert queue.calls == 2
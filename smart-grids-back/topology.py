@@ -0,0 +1,219 @@
+"""
+Topología radial de la red: consumidores -> alimentadores -> subestaciones.
+
+Cada nivel se guarda como una matriz de incidencia dispersa (CSR) de forma
+(nodos x hijos), de modo que la carga de todos los nodos de un nivel para un
+bloque de horas es un único producto disperso-denso:
+
+    carga_alimentadores = A_alimentadores @ carga_consumidores   (consumidores x horas)
+    carga_subestaciones = A_subestaciones @ carga_alimentadores
+
+Los consumidores se ordenan como en la simulación: hogares, comercios e
+industrias. SciPy se usa si está instalado; si no, el producto se calcula
+con NumPy (sumas por segmentos sobre el mismo formato CSR).
+"""
+import numpy as np
+
+# Consumo medio aproximado por tipo de generate_base_consumption() (kW), para dimensionar capacidades
+NOMINAL_CONSUMPTION = {"home": 1.6, "business": 4.0, "industry": 15.0}
+
+# Memoria máxima del bloque denso consumidores x horas antes de agregarlo
+MAX_CHUNK_BYTES = 64 * 1024 * 1024
+
+class IncidenceMatrix:
+    """Matriz de incidencia CSR (nodos x hijos) en la que cada hijo cuelga de un único nodo"""
+    def __init__(self, parents, num_nodes: int):
+        parents = np.asarray(parents, dtype=np.int64)
+        counts = np.bincount(parents, minlength=num_nodes)
+        self.shape = (num_nodes, parents.shape[0])
+        self.indptr = np.concatenate(([0], np.cumsum(counts)))
+        self.indices = np.argsort(parents, kind="stable")
+        self.data = np.ones(parents.shape[0])
+        self._empty_rows = counts == 0
+
+        try:
+            from scipy import sparse
+        except ImportError:
+            self._csr = None
+        else:
+            self._csr = sparse.csr_matrix((self.data, self.indices, self.indptr), shape=self.shape)
+
+    def dot(self, dense: np.ndarray) -> np.ndarray:
+        """Producto disperso-denso: (hijos x columnas) -> (nodos x columnas)"""
+        if self._csr is not None:
+            return np.asarray(self._csr @ dense)
+
+        # Sin SciPy: ordenar las filas por nodo y sumar cada segmento. reduceat
+        # solo recibe los inicios de los nodos con hijos (estrictamente crecientes),
+        # así cada segmento termina donde empieza el del siguiente nodo no vacío
+        result = np.zeros((self.shape[0],) + dense.shape[1:], dtype=dense.dtype)
+        filled = ~self._empty_rows
+        if filled.any():
+            result[filled] = np.add.reduceat(dense[self.indices], self.indptr[:-1][filled], axis=0)
+        return result
+
+class GridTopology:
+    """
+    Jerarquía de niveles de la red. El nivel 0 agrupa consumidores; cada nivel
+    siguiente agrupa los nodos del anterior.
+
+    Args:
+        level_names: Nombre de cada nivel ('feeder', 'substation', ...)
+        parents: Para cada nivel, el índice de nodo padre de cada hijo
+        capacities: Capacidad (kW) de cada nodo de cada nivel
+    """
+    def __init__(self, level_names, parents, capacities):
+        self.level_names = list(level_names)
+        self.capacities = [np.asarray(c, dtype=np.float64) for c in capacities]
+        self.incidence = [
+            IncidenceMatrix(p, len(c)) for p, c in zip(parents, self.capacities)
+        ]
+        self.num_consumers = self.incidence[0].shape[1]
+
+    def level_loads(self, consumer_loads: np.ndarray):
+        """
+        Carga de todos los nodos de cada nivel.
+
+        Args:
+            consumer_loads: Carga por consumidor, forma (consumidores x columnas)
+
+        Returns:
+            Lista con un arreglo (nodos x columnas) por nivel
+        """
+        loads = []
+        current = consumer_loads
+        for incidence in self.incidence:
+            current = incidence.dot(current)
+            loads.append(current)
+        return loads
+
+def build_topology(num_homes: int, num_commercial: int, num_industrial: int,
+                   feeders: int, substations: int = 1, capacity_factor: float = 1.5,
+                   seed=None, consumer_feeder=None, feeder_substation=None,
+                   feeder_capacities=None, substation_capacities=None) -> GridTopology:
+    """
+    Genera una topología radial: cada consumidor se conecta a un alimentador y
+    cada alimentador a una subestación, según la asignación indicada o, si no
+    se indica, al azar (topología sintética).
+
+    Salvo que se indique, la capacidad de cada nodo es `capacity_factor` veces
+    el consumo nominal de los consumidores que alimenta (NOMINAL_CONSUMPTION).
+
+    Args:
+        num_homes, num_commercial, num_industrial: Consumidores por tipo
+        feeders: Número de alimentadores
+        substations: Número de subestaciones
+        capacity_factor: Margen de capacidad sobre el consumo nominal
+        seed: Semilla de la asignación aleatoria (no altera np.random global)
+        consumer_feeder: Alimentador de cada consumidor (hogares, comercios e industrias)
+        feeder_substation: Subestación de cada alimentador
+        feeder_capacities, substation_capacities: Capacidades (kW) explícitas
+
+    Returns:
+        GridTopology con niveles 'feeder' y 'substation'
+    """
+    rng = np.random.default_rng(seed)
+    num_consumers = num_homes + num_commercial + num_industrial
+
+    nominal = np.concatenate((
+        np.full(num_homes, NOMINAL_CONSUMPTION["home"]),
+        np.full(num_commercial, NOMINAL_CONSUMPTION["business"]),
+        np.full(num_industrial, NOMINAL_CONSUMPTION["industry"])
+    ))
+    # Los sorteos se hacen siempre, para que fijar un nivel no cambie el otro
+    random_feeder = rng.integers(0, feeders, size=num_consumers)
+    random_substation = rng.integers(0, substations, size=feeders)
+    consumer_feeder = random_feeder if consumer_feeder is None else np.asarray(consumer_feeder, dtype=np.int64)
+    feeder_substation = random_substation if feeder_substation is None else np.asarray(feeder_substation, dtype=np.int64)
+    if consumer_feeder.shape != (num_consumers,) or feeder_substation.shape != (feeders,):
+        raise ValueError("Topology mapping must have one feeder per consumer and one substation per feeder")
+
+    feeder_nominal = np.bincount(consumer_feeder, weights=nominal, minlength=feeders)
+    substation_nominal = np.bincount(feeder_substation, weights=feeder_nominal, minlength=substations)
+    if feeder_capacities is None:
+        feeder_capacities = feeder_nominal * capacity_factor
+    if substation_capacities is None:
+        substation_capacities = substation_nominal * capacity_factor
+
+    return GridTopology(
+        ["feeder", "substation"],
+        [consumer_feeder, feeder_substation],
+        [feeder_capacities, substation_capacities]
+    )
+
+class TopologyLoadCollector:
+    """
+    Acumula, hora a hora y muestra a muestra, la carga por consumidor y la
+    agrega por bloques de horas con la topología. Solo guarda estadísticas por
+    nodo (pico y horas en sobrecarga), nunca la serie completa de cada nodo.
+    """
+    def __init__(self, topology: GridTopology, hours: int, dtype=np.float64):
+        self.topology = topology
+        self.hours = hours
+        self.samples = 0
+        # En float32 caben el doble de horas por bloque
+        columns = MAX_CHUNK_BYTES // (np.dtype(dtype).itemsize * max(1, topology.num_consumers))
+        # Orden Fortran: cada hora es una columna contigua
+        self._buffer = np.empty((topology.num_consumers, max(1, min(hours, columns))), dtype=dtype, order='F')
+        # Horas que caben en el bloque: los productores no deben retener más cargas por consumidor
+        self.block_hours = self._buffer.shape[1]
+        self._filled = 0
+        self.peaks = [np.zeros(len(c)) for c in topology.capacities]
+        self.overload_counts = [np.zeros(len(c), dtype=np.int64) for c in topology.capacities]
+
+    def add(self, *type_loads):
+        """Registra la carga de una hora (arreglos por tipo, en orden hogares, comercios, industrias)"""
+        np.concatenate(type_loads, out=self._buffer[:, self._filled])
+        self._filled += 1
+        if self._filled == self._buffer.shape[1]:
+            self._flush()
+
+    def end_sample(self):
+        self._flush()
+        self.samples += 1
+
+    def _flush(self):
+        if self._filled == 0:
+            return
+        level_loads = self.topology.level_loads(self._buffer[:, :self._filled])
+        for level, loads in enumerate(level_loads):
+            np.maximum(self.peaks[level], loads.max(axis=1), out=self.peaks[level])
+            self.overload_counts[level] += (loads > self.topology.capacities[level][:, np.newaxis]).sum(axis=1)
+        self._filled = 0
+
+    def stats(self) -> dict:
+        """Estadísticas parciales serializables, combinables con merge_stats()"""
+        self._flush()
+        return {
+            "samples": self.samples,
+            "peaks": [p.tolist() for p in self.peaks],
+            "overload_counts": [c.tolist() for c in self.overload_counts]
+        }
+
+    def merge_stats(self, stats: dict):
+        """Combina las estadísticas de otro colector con la misma topología (p. ej. de un worker)"""
+        for level, (peaks, counts) in enumerate(zip(stats["peaks"], stats["overload_counts"])):
+            np.maximum(self.peaks[level], peaks, out=self.peaks[level])
+            self.overload_counts[level] += np.asarray(counts, dtype=np.int64)
+        self.samples += stats["samples"]
+
+    def summary(self) -> dict:
+        """Picos y número de horas en sobrecarga (sumadas sobre las muestras) por nodo"""
+        levels = []
+        for name, capacities, peaks, counts in zip(
+            self.topology.level_names, self.topology.capacities, self.peaks, self.overload_counts
+        ):
+            levels.append({
+                "level": name,
+                "nodes": [
+                    {
+                        "id": f"{name}-{i}",
+                        "peak_load": float(peaks[i]),
+                        "capacity": float(capacities[i]),
+                        "overload_count": int(counts[i])
+                    }
+                    for i in range(len(capacities))
+                ],
+                "overloaded_nodes": int((counts > 0).sum())
+            })
+        return {"samples": self.samples, "hours": self.hours, "levels": levels}
@@ -0,0 +1,316 @@
+"""
+Colas de trabajo para el Monte Carlo distribuido.
+
+simulate_demand() publica cada bloque de muestras como una tarea (payload
+JSON) en una cola; los workers (worker.py) reclaman tareas, las simulan y
+publican el resultado parcial. La cola es intercambiable por URL:
+
+- sqlite:///ruta/cola.db   Base SQLite compartida (un servidor o disco de red)
+- file:///ruta/directorio  Directorio compartido: un archivo por tarea; el
+                           reclamo es un os.rename() atómico
+
+Se pueden registrar otros backends (Redis, SQS, ...) con register_queue_backend().
+Una tarea reclamada cuyo worker no la completa en `lease_seconds` vuelve a
+estar disponible para otro worker.
+"""
+import json
+import os
+import shutil
+import sqlite3
+import time
+from contextlib import closing
+from dataclasses import dataclass
+from typing import Optional
+
+# Tiempo tras el que una tarea reclamada y no completada se reasigna
+DEFAULT_LEASE_SECONDS = 600
+
+@dataclass
+class Task:
+    job_id: str
+    task_id: str
+    payload: dict
+
+class WorkQueue:
+    """Interfaz de las colas de trabajo"""
+    def __init__(self, lease_seconds: float = DEFAULT_LEASE_SECONDS):
+        self.lease_seconds = lease_seconds
+
+    def submit(self, job_id: str, payloads: dict):
+        """Publica las tareas de un trabajo ({task_id: payload})"""
+        raise NotImplementedError
+
+    def claim(self, worker_id: str, job_id: Optional[str] = None) -> Optional[Task]:
+        """Reclama una tarea pendiente (de cualquier trabajo o solo de `job_id`), o None"""
+        raise NotImplementedError
+
+    def complete(self, task: Task, result: dict):
+        raise NotImplementedError
+
+    def fail(self, task: Task, error: str):
+        raise NotImplementedError
+
+    def results(self, job_id: str) -> dict:
+        """Resultados publicados hasta ahora ({task_id: result})"""
+        raise NotImplementedError
+
+    def errors(self, job_id: str) -> dict:
+        """Errores publicados hasta ahora ({task_id: mensaje})"""
+        raise NotImplementedError
+
+    def count_done(self, job_id: str) -> int:
+        """
+        Número de tareas completadas, sin leer sus resultados (el coordinador
+        lo consulta en cada espera). Los backends deberían sobrescribirlo.
+        """
+        return len(self.results(job_id))
+
+    def purge(self, job_id: str):
+        """Elimina las tareas y resultados de un trabajo"""
+        raise NotImplementedError
+
+class SQLiteWorkQueue(WorkQueue):
+    """Cola sobre una base SQLite (una fila por tarea)"""
+    def __init__(self, path: str, lease_seconds: float = DEFAULT_LEASE_SECONDS):
+        super().__init__(lease_seconds)
+        self.path = path
+        with closing(self._connect()) as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS tasks (
+                    job_id TEXT NOT NULL,
+                    task_id TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    status TEXT NOT NULL DEFAULT 'pending',
+                    worker_id TEXT,
+                    claimed_at REAL,
+                    result TEXT,
+                    error TEXT,
+                    PRIMARY KEY (job_id, task_id)
+                )
+            """)
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=30, isolation_level=None)
+
+    def submit(self, job_id, payloads):
+        with closing(self._connect()) as conn:
+            conn.execute("BEGIN")
+            conn.executemany(
+                "INSERT INTO tasks (job_id, task_id, payload) VALUES (?, ?, ?)",
+                [(job_id, task_id, json.dumps(payload)) for task_id, payload in payloads.items()]
+            )
+            conn.execute("COMMIT")
+
+    def claim(self, worker_id, job_id=None):
+        now = time.time()
+        conn = self._connect()
+        try:
+            # BEGIN IMMEDIATE: un único worker puede reclamar a la vez
+            conn.execute("BEGIN IMMEDIATE")
+            query = ("SELECT job_id, task_id, payload FROM tasks WHERE "
+                     "(status = 'pending' OR (status = 'running' AND claimed_at < ?))")
+            args = [now - self.lease_seconds]
+            if job_id is not None:
+                query += " AND job_id = ?"
+                args.append(job_id)
+            row = conn.execute(query + " LIMIT 1", args).fetchone()
+            if row is None:
+                conn.execute("COMMIT")
+                return None
+            conn.execute(
+                "UPDATE tasks SET status = 'running', worker_id = ?, claimed_at = ? "
+                "WHERE job_id = ? AND task_id = ?",
+                (worker_id, now, row[0], row[1])
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+        return Task(row[0], row[1], json.loads(row[2]))
+
+    def _finish(self, task, status, column, value):
+        with closing(self._connect()) as conn:
+            conn.execute(
+                f"UPDATE tasks SET status = ?, {column} = ? WHERE job_id = ? AND task_id = ?",
+                (status, value, task.job_id, task.task_id)
+            )
+
+    def complete(self, task, result):
+        self._finish(task, "done", "result", json.dumps(result))
+
+    def fail(self, task, error):
+        self._finish(task, "failed", "error", error)
+
+    def results(self, job_id):
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                "SELECT task_id, result FROM tasks WHERE job_id = ? AND status = 'done'", (job_id,)
+            ).fetchall()
+        return {task_id: json.loads(result) for task_id, result in rows}
+
+    def errors(self, job_id):
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                "SELECT task_id, error FROM tasks WHERE job_id = ? AND status = 'failed'", (job_id,)
+            ).fetchall()
+        return dict(rows)
+
+    def count_done(self, job_id):
+        with closing(self._connect()) as conn:
+            (count,) = conn.execute(
+                "SELECT COUNT(*) FROM tasks WHERE job_id = ? AND status = 'done'", (job_id,)
+            ).fetchone()
+        return count
+
+    def purge(self, job_id):
+        with closing(self._connect()) as conn:
+            conn.execute("DELETE FROM tasks WHERE job_id = ?", (job_id,))
+
+class FileSystemWorkQueue(WorkQueue):
+    """
+    Cola sobre un directorio compartido:
+
+        <root>/<job_id>/pending/<task_id>.json
+        <root>/<job_id>/running/<task_id>.json
+        <root>/<job_id>/done/<task_id>.json
+        <root>/<job_id>/failed/<task_id>.json
+    """
+    STATES = ("pending", "running", "done", "failed")
+
+    def __init__(self, root: str, lease_seconds: float = DEFAULT_LEASE_SECONDS):
+        super().__init__(lease_seconds)
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+    def _dir(self, job_id, state):
+        return os.path.join(self.root, job_id, state)
+
+    def _write(self, path, data):
+        # Escritura atómica: los lectores nunca ven un archivo a medias
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, path)
+
+    def submit(self, job_id, payloads):
+        for state in self.STATES:
+            os.makedirs(self._dir(job_id, state), exist_ok=True)
+        for task_id, payload in payloads.items():
+            self._write(os.path.join(self._dir(job_id, "pending"), f"{task_id}.json"), payload)
+
+    def _requeue_expired(self, job_id):
+        running = self._dir(job_id, "running")
+        deadline = time.time() - self.lease_seconds
+        try:
+            names = os.listdir(running)
+        except FileNotFoundError:
+            return
+        for name in names:
+            path = os.path.join(running, name)
+            try:
+                if name.endswith(".json") and os.path.getmtime(path) < deadline:
+                    os.rename(path, os.path.join(self._dir(job_id, "pending"), name))
+            except FileNotFoundError:
+                pass
+
+    def claim(self, worker_id, job_id=None):
+        if job_id is not None:
+            job_ids = [job_id]
+        else:
+            job_ids = sorted(os.listdir(self.root)) if os.path.isdir(self.root) else []
+
+        # El coordinador puede eliminar el trabajo (purge) en cualquier momento:
+        # un directorio o archivo que desaparece equivale a no haber tarea
+        for job in job_ids:
+            pending = self._dir(job, "pending")
+            self._requeue_expired(job)
+            try:
+                names = sorted(os.listdir(pending))
+            except FileNotFoundError:
+                continue
+            for name in names:
+                if not name.endswith(".json"):
+                    continue
+                running_path = os.path.join(self._dir(job, "running"), name)
+                try:
+                    # Solo un worker gana el rename
+                    os.rename(os.path.join(pending, name), running_path)
+                    # El mtime del archivo en running/ marca el inicio del reclamo
+                    os.utime(running_path)
+                    with open(running_path) as f:
+                        payload = json.load(f)
+                except FileNotFoundError:
+                    continue
+                return Task(job, name[:-len(".json")], payload)
+        return None
+
+    def _finish(self, task, state, data):
+        # Trabajo eliminado mientras se ejecutaba la tarea (timeout o fallo de
+        # otro bloque): el resultado ya no interesa a nadie
+        if not os.path.isdir(os.path.join(self.root, task.job_id)):
+            return
+        try:
+            self._write(os.path.join(self._dir(task.job_id, state), f"{task.task_id}.json"), data)
+            os.remove(os.path.join(self._dir(task.job_id, "running"), f"{task.task_id}.json"))
+        except FileNotFoundError:
+            pass
+
+    def complete(self, task, result):
+        self._finish(task, "done", result)
+
+    def fail(self, task, error):
+        self._finish(task, "failed", {"error": error})
+
+    def _read_state(self, job_id, state):
+        directory = self._dir(job_id, state)
+        if not os.path.isdir(directory):
+            return {}
+        entries = {}
+        try:
+            for name in os.listdir(directory):
+                if name.endswith(".json"):
+                    with open(os.path.join(directory, name)) as f:
+                        entries[name[:-len(".json")]] = json.load(f)
+        except FileNotFoundError:
+            pass
+        return entries
+
+    def results(self, job_id):
+        return self._read_state(job_id, "done")
+
+    def errors(self, job_id):
+        return {task_id: data["error"] for task_id, data in self._read_state(job_id, "failed").items()}
+
+    def count_done(self, job_id):
+        # Los archivos temporales de _write() no terminan en .json
+        try:
+            return sum(name.endswith(".json") for name in os.listdir(self._dir(job_id, "done")))
+        except FileNotFoundError:
+            return 0
+
+    def purge(self, job_id):
+        shutil.rmtree(os.path.join(self.root, job_id), ignore_errors=True)
+
+QUEUE_BACKENDS = {
+    "sqlite": SQLiteWorkQueue,
+    "file": FileSystemWorkQueue
+}
+
+def register_queue_backend(scheme: str, factory):
+    """Registra un backend de cola: factory(location, lease_seconds=...) -> WorkQueue"""
+    QUEUE_BACKENDS[scheme] = factory
+
+def get_work_queue(url: Optional[str] = None, lease_seconds: float = DEFAULT_LEASE_SECONDS) -> WorkQueue:
+    """
+    Abre la cola indicada por `url` (por defecto la variable de entorno
+    SIMULATION_QUEUE), p. ej. 'sqlite:///tmp/cola.db' o 'file:///mnt/cola'.
+    """
+    url = url or os.getenv("SIMULATION_QUEUE")
+    if not url:
+        raise ValueError("No work queue configured (set SIMULATION_QUEUE, e.g. sqlite:///tmp/queue.db)")
+    scheme, separator, location = url.partition("://")
+    if not separator or scheme not in QUEUE_BACKENDS:
+        raise ValueError(f"Unknown work queue '{url}'. Expected one of: {', '.join(f'{s}://' for s in QUEUE_BACKENDS)}")
+    return QUEUE_BACKENDS[scheme](location, lease_seconds=lease_seconds)
@@ -0,0 +1,72 @@
+"""
+Worker del Monte Carlo distribuido.
+
+Reclama bloques de muestras publicados por simulate_demand() (con
+params.distributed) en la cola de trabajo, los simula y publica las
+estadísticas parciales. Se pueden lanzar tantos workers como se quiera, en
+esta u otras máquinas que compartan la cola.
+
+Uso:
+    python worker.py --queue sqlite:///tmp/queue.db
+    python worker.py --queue file:///mnt/shared/queue --burst
+"""
+import argparse
+import logging
+import os
+import socket
+import time
+
+from simulation import process_task, warm_up
+from work_queue import DEFAULT_LEASE_SECONDS, get_work_queue
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def run_worker(queue, worker_id: str, poll_interval: float = 1.0, burst: bool = False) -> int:
+    """
+    Procesa tareas de la cola hasta interrumpirse (o, con `burst`, hasta
+    que no queden tareas pendientes).
+
+    Returns:
+        Número de tareas procesadas
+    """
+    processed = 0
+    while True:
+        try:
+            task = queue.claim(worker_id)
+            if task is None:
+                if burst:
+                    return processed
+                time.sleep(poll_interval)
+                continue
+            start = time.perf_counter()
+            process_task(queue, task)
+        except Exception:
+            # Cola no disponible o trabajo eliminado a mitad de tarea: seguir consultando
+            logger.exception("Work queue error; retrying")
+            time.sleep(poll_interval)
+            continue
+        processed += 1
+        logger.info(f"Task {task.job_id}/{task.task_id} processed in {time.perf_counter() - start:.2f} s")
+
+def main():
+    parser = argparse.ArgumentParser(description="Worker del Monte Carlo distribuido")
+    parser.add_argument("--queue", default=None, help="URL de la cola (por defecto SIMULATION_QUEUE)")
+    parser.add_argument("--id", default=f"{socket.gethostname()}-{os.getpid()}", help="Identificador del worker")
+    parser.add_argument("--poll", type=float, default=1.0, help="Intervalo de consulta sin tareas (s)")
+    parser.add_argument("--lease", type=float, default=DEFAULT_LEASE_SECONDS,
+                        help="Segundos tras los que una tarea no completada se reasigna")
+    parser.add_argument("--burst", action="store_true", help="Salir cuando no queden tareas")
+    args = parser.parse_args()
+
+    queue = get_work_queue(args.queue, lease_seconds=args.lease)
+    warm_up()
+    logger.info(f"Worker {args.id} waiting for tasks")
+    try:
+        processed = run_worker(queue, args.id, args.poll, args.burst)
+    except KeyboardInterrupt:
+        return
+    logger.info(f"Worker {args.id} processed {processed} tasks")
+
+if __name__ == "__main__":
+    main()
@@ -5,6 +5,10 @@
 // URL base de la API (ajustar según el entorno)
 const API_URL = process.env.REACT_APP_API_URL || "http://localhost:8000";
 
+// Puntos máximos por serie temporal: el backend reduce las series largas
+// conservando picos y valles (ver time_index en la respuesta)
+export const MAX_CHART_POINTS = 2000;
+
 /**
  * Ejecuta una simulación de respuesta a la demanda
  *
@@ -17,13 +21,14 @@ const API_URL = process.env.REACT_APP_API_URL || "http://localhost:8000";
  * @param {number} params.monte_carlo_samples - Número de muestras para Monte Carlo
  * @param {number} params.start_hour - Hora del día para iniciar (0-23)
  * @param {string} params.day_type - Tipo de día ('weekday', 'weekend')
+ * @param {number} maxPoints - Puntos máximos por serie temporal
  * @returns {Promise<Object>} - Resultado de la simulación
  */
-export const runSimulation = async (params) => {
+export const runSimulation = async (params, maxPoints = MAX_CHART_POINTS) => {
   try {
     console.log("Enviando parámetros:", params);
 
-    const response = await fetch(`${API_URL}/simulate`, {
+    const response = await fetch(`${API_URL}/simulate?max_points=${maxPoints}`, {
       method: "POST",
       headers: {
         "Content-Type": "application/json",
@@ -46,14 +51,17 @@ export const runSimulation = async (params) => {
 };
 
 /**
- * Obtiene datos de simulación previos (si existe la funcionalidad en el backend)
+ * Obtiene un resultado guardado en el backend (simulation_id de la respuesta)
  *
  * @param {string} id - Identificador de la simulación
+ * @param {number} maxPoints - Puntos máximos por serie temporal
  * @returns {Promise<Object>} - Datos de la simulación
  */
-export const getSimulationById = async (id) => {
+export const getSimulationById = async (id, maxPoints = MAX_CHART_POINTS) => {
   try {
-    const response = await fetch(`${API_URL}/simulations/${id}`);
+    const response = await fetch(
+      `${API_URL}/simulations/${id}?max_points=${maxPoints}`
+    );
 
     if (!response.ok) {
       throw new Error(`Error ${response.status}: ${response.statusText}`);
@@ -16,6 +16,8 @@ export default function DemandChart({
   data,
   showConfidence = false,
   strategy = "fixed",
+  metrics = null,
+  resolution = null,
 }) {
   // Depuración mejorada
   React.useEffect(() => {
@@ -270,6 +272,27 @@ export default function DemandChart({
     );
   }
 
+  // Métricas de resumen: las del backend, calculadas con la serie completa
+  // (data puede venir reducida con max_points); si faltan, las de los puntos
+  const fromMetrics = (key, fallback) =>
+    metrics && typeof metrics[key] === "number" && metrics[key] > 0
+      ? metrics[key]
+      : fallback();
+  const peakCurrent = fromMetrics("peak_demand_dr", () =>
+    Math.max(...finalData.map((d) => d.dr_demand))
+  );
+  const peakReference = fromMetrics("peak_demand_fixed", () =>
+    Math.max(...finalData.map((d) => d.fixed_demand))
+  );
+  const averageCurrent = fromMetrics(
+    "avg_demand_dr",
+    () => finalData.reduce((sum, d) => sum + d.dr_demand, 0) / finalData.length
+  );
+  const resolutionLabel =
+    resolution && resolution.downsampled
+      ? `Serie reducida de ${resolution.hours} horas`
+      : "Resolución horaria";
+
   const minDemand = Math.min(...allDemandValues);
   const maxDemand = Math.max(...allDemandValues);
   const demandRange = maxDemand - minDemand;
@@ -492,7 +515,7 @@ export default function DemandChart({
               )}
             </div>
             <div className="text-xs text-gray-500 dark:text-gray-400">
-              {finalData.length} puntos de datos • Resolución horaria
+              {finalData.length} puntos de datos • {resolutionLabel}
               {strategy === "fixed" && (
                 <span className="ml-2 text-blue-600 dark:text-blue-400">
                   • Escenario base
@@ -735,7 +758,7 @@ export default function DemandChart({
               className="text-2xl font-bold"
               style={{ color: colors.primary }}
             >
-              {Math.max(...finalData.map((d) => d.dr_demand)).toFixed(1)} kW
+              {peakCurrent.toFixed(1)} kW
             </div>
             <div className="text-xs text-gray-500 dark:text-gray-400 mt-1">
               {strategy === "fixed"
@@ -766,8 +789,7 @@ export default function DemandChart({
                 </svg>
               </div>
               <div className="text-2xl font-bold text-gray-500">
-                {Math.max(...finalData.map((d) => d.fixed_demand)).toFixed(1)}{" "}
-                kW
+                {peakReference.toFixed(1)} kW
               </div>
               <div className="text-xs text-gray-500 dark:text-gray-400 mt-1">
                 Sin optimización
@@ -797,19 +819,12 @@ export default function DemandChart({
                 </svg>
               </div>
               <div className="text-2xl font-bold text-green-600">
-                {(
-                  Math.max(...finalData.map((d) => d.fixed_demand)) -
-                  Math.max(...finalData.map((d) => d.dr_demand))
-                ).toFixed(1)}{" "}
-                kW
+                {(peakReference - peakCurrent).toFixed(1)} kW
               </div>
               <div className="text-sm font-semibold text-green-700 dark:text-green-300">
-                {(
-                  ((Math.max(...finalData.map((d) => d.fixed_demand)) -
-                    Math.max(...finalData.map((d) => d.dr_demand))) /
-                    Math.max(...finalData.map((d) => d.fixed_demand))) *
-                  100
-                ).toFixed(1)}
+                {(((peakReference - peakCurrent) / peakReference) * 100).toFixed(
+                  1
+                )}
                 % reducción
               </div>
             </div>
@@ -834,20 +849,11 @@ export default function DemandChart({
                 </svg>
               </div>
               <div className="text-2xl font-bold text-blue-600">
-                {(
-                  finalData.reduce((sum, d) => sum + d.dr_demand, 0) /
-                  finalData.length
-                ).toFixed(1)}{" "}
-                kW
+                {averageCurrent.toFixed(1)} kW
               </div>
               <div className="text-xs text-gray-500 dark:text-gray-400 mt-1">
                 Factor de carga:{" "}
-                {(
-                  (finalData.reduce((sum, d) => sum + d.dr_demand, 0) /
-                    finalData.length /
-                    Math.max(...finalData.map((d) => d.dr_demand))) *
-                  100
-                ).toFixed(1)}
+                {((averageCurrent / peakCurrent) * 100).toFixed(1)}
                 %
               </div>
             </div>
@@ -39,9 +39,13 @@ export default function Dashboard() {
     }
 
     // Construir estructura para el gráfico con validación mejorada
+    // Con series reducidas en el backend, time_index indica la hora de cada punto
+    const hourOf = (i) =>
+      apiResults.time_index ? apiResults.time_index[i] : i;
+
     const hourlyData = apiResults.time_series.map((value, i) => {
       const entry = {
-        hour: i % 24,
+        hour: hourOf(i) % 24,
         dr_demand: typeof value === "number" ? value : 0,
       };
 
@@ -61,7 +65,7 @@ export default function Dashboard() {
           `⚠️ No hay datos fixed_demand válidos para estrategia '${currentStrategy}'. Generando referencia estimada.`
         );
         // Generar una referencia más realista basada en patrones típicos
-        const hourOfDay = i % 24;
+        const hourOfDay = hourOf(i) % 24;
         let multiplier = 1.12; // Base de 12% más alto sin optimización
 
         // Ajustar multiplicador según la hora del día (picos típicos)
@@ -203,9 +207,12 @@ export default function Dashboard() {
     const hours = typeof apiResults.hours === "number" ? apiResults.hours : 24;
     const totalEnergyConsumption = avgDemand * hours;
 
-    // Calcular precio promedio con validación
+    // Precio promedio: el backend lo calcula con la serie completa
+    // (price_series puede venir reducida con max_points)
     let averagePrice = 0.15; // Valor por defecto
-    if (apiResults.price_series && Array.isArray(apiResults.price_series)) {
+    if (typeof apiResults.average_price === "number" && apiResults.average_price > 0) {
+      averagePrice = apiResults.average_price;
+    } else if (apiResults.price_series && Array.isArray(apiResults.price_series)) {
       const validPrices = apiResults.price_series.filter(
         (price) => typeof price === "number" && price > 0
       );
@@ -312,6 +319,11 @@ export default function Dashboard() {
       network_data: validatedNetworkData,
       energy_system: apiResults.final_energy_system,
       strategy: currentStrategy, // Incluir estrategia en los resultados
+      // Con time_index, demand_data es la serie reducida por el backend
+      resolution: {
+        hours,
+        downsampled: Array.isArray(apiResults.time_index),
+      },
     };
   };
 
@@ -528,6 +540,8 @@ export default function Dashboard() {
                       simulationResults.metrics.monte_carlo_samples > 1
                     }
                     strategy={simulationResults.strategy}
+                    metrics={simulationResults.metrics}
+                    resolution={simulationResults.resolution}
                   />
                 </div>
               </div>